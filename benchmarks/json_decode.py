@@ -0,0 +1,37 @@
+"""
+Compare JSON decoders on Altmetric payloads.
+
+Run from the repository root:
+
+    python benchmarks/json_decode.py
+
+Prints articles per second for decoding the test fixtures with each
+available decoder and building an Article from the result.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyaltmetric import Article, decoder
+
+FIXTURES = ('tests/fixtures/full.json', 'tests/fixtures/average.json')
+
+def main(number = 20000):
+    names = ['json']
+    if decoder.orjson is not None:
+        names.append('orjson')
+    for filename in FIXTURES:
+        with open(filename, 'rb') as fi:
+            payload = fi.read()
+        for name in names:
+            decoder.set_decoder(name)
+            seconds = timeit.timeit(lambda: Article(decoder.loads(payload)),
+                number = number)
+            print("%-30s %-7s %10.0f articles/sec" % (filename, name,
+                number / seconds))
+
+if __name__ == '__main__':
+    main()
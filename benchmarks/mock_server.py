@@ -0,0 +1,125 @@
+"""
+A local stand-in for api.altmetric.com used by the benchmarks.
+
+It answers the v1 lookup methods (doi, pmid, id, ads, arxiv) and
+citations/<timeframe> with payloads built from tests/fixtures/full.json.
+Latency, the share of requests failing with 502 and the number of
+citation pages are configurable.
+
+    with MockAltmetricServer(latency = 0.01, num_pages = 5) as server:
+        api = Altmetric(api_host = server.url)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tests', 'fixtures', 'full.json')
+
+LOOKUP_METHODS = ('doi', 'pmid', 'id', 'ads', 'arxiv')
+
+class MockAltmetricServer(object):
+    def __init__(self, latency = 0.0, error_rate = 0.0, num_pages = 10,
+        seed = 0):
+        """
+        :param latency: Seconds to wait before answering each request.
+        :param error_rate: Share of requests answered with a 502, 0-1.
+        :param num_pages: Number of non-empty citations pages.
+        :param seed: Seed for the error sequence, so runs are repeatable.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.num_pages = num_pages
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        with open(FIXTURE) as fi:
+            self._template = json.load(fi)
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        """Start serving on a free localhost port."""
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = threading.Thread(target = self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        """Value to pass as api_host to the Altmetric clients."""
+        host, port = self._httpd.server_address[:2]
+        return "http://%s:%d/" % (host, port)
+
+    def article(self, doi, altmetric_id = 1):
+        raw = dict(self._template)
+        raw['doi'] = doi
+        raw['altmetric_id'] = altmetric_id
+        return raw
+
+    def answer(self, path, query):
+        """Return (status, body) for a request path and parsed query."""
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+        if failed:
+            return 502, None
+
+        parts = path.strip('/').split('/', 2)
+        if len(parts) < 3:
+            return 404, None
+        version, method, identifier = parts
+        if method in LOOKUP_METHODS:
+            if identifier.startswith('missing'):
+                return 404, None
+            return 200, self.article(identifier)
+        if method == 'citations':
+            page = int(query.get('page', ['1'])[0])
+            num_results = int(query.get('num_results', ['100'])[0])
+            if page > self.num_pages:
+                return 404, None
+            first = (page - 1) * num_results
+            results = [self.article("10.9999/%d" % n, n)
+                for n in range(first, first + num_results)]
+            return 200, {'query': {'page': page}, 'results': results}
+        return 404, None
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        mock = self.server.mock
+        if mock.latency:
+            time.sleep(mock.latency)
+        url = urlparse(self.path)
+        status, payload = mock.answer(url.path, parse_qs(url.query))
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,160 @@
+"""
+Offline benchmark suite for PyAltmetric.
+
+Run from the repository root:
+
+    python benchmarks/run.py --output bench_output.json
+
+Parsing benchmarks use the test fixtures. End-to-end benchmarks run
+against the local MockAltmetricServer, never the real API. Results are
+written as JSON with, for each benchmark, operations per second, latency
+percentiles in milliseconds, peak traced memory in bytes and the number
+of failed operations.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pyaltmetric import Altmetric, AltmetricException, Article, \
+    ARTICLE_FIELDS, decoder
+from benchmarks.mock_server import MockAltmetricServer
+
+def _load_fixture(name):
+    with open(os.path.join(ROOT, 'tests', 'fixtures', name)) as fi:
+        return json.load(fi)
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def measure(name, operation, number, memory_number = None):
+    """
+    Call operation number times. operation returns how many items it
+    handled (None counts as one). Return a result dictionary.
+    """
+    latencies = []
+    items = 0
+    errors = 0
+    start = time.perf_counter()
+    for i in range(number):
+        began = time.perf_counter()
+        try:
+            handled = operation()
+        except AltmetricException:
+            errors += 1
+            handled = 0
+        latencies.append(time.perf_counter() - began)
+        items += 1 if handled is None else handled
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for i in range(memory_number or min(number, 50)):
+        try:
+            operation()
+        except AltmetricException:
+            pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'name': name,
+        'operations': number,
+        'items': items,
+        'errors': errors,
+        'seconds': elapsed,
+        'ops_per_sec': number / elapsed,
+        'items_per_sec': items / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_memory_bytes': peak,
+    }
+
+def parsing_benchmarks(number):
+    raw = _load_fixture('full.json')
+    article = Article(raw)
+
+    def read_all_properties():
+        fresh = Article(raw)
+        for field in ARTICLE_FIELDS:
+            getattr(fresh, field)
+
+    return [
+        measure('article_construct', lambda: Article(raw) and None, number),
+        measure('article_all_properties', read_all_properties, number),
+        measure('parse_score_history', lambda: article._parse_score_history(
+            raw['history']) and None, number),
+        measure('parse_score_context', lambda: article._parse_score_context(
+            raw['context']) and None, number),
+        measure('score_for', lambda: article.score_for('1w') and None,
+            number),
+        measure('context_percentile', lambda: article.context_percentile(
+            'journal') and None, number),
+    ]
+
+def network_benchmarks(number, pages, per_page, latency, error_rate):
+    results = []
+    with MockAltmetricServer(latency = latency, error_rate = error_rate,
+        num_pages = pages) as server:
+        with Altmetric(api_host = server.url, backoff_factor = 0.01) as api:
+            counter = iter(range(10 ** 9))
+            results.append(measure('article_from_doi',
+                lambda: api.article_from_doi("10.9999/%d" % next(counter))
+                    and None, number))
+
+            def crawl():
+                return sum(1 for a in api.articles_from_timeframe('1w',
+                    num_results = per_page))
+            results.append(measure('articles_from_timeframe', crawl,
+                max(1, number // 100), memory_number = 1))
+    return results
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[1])
+    parser.add_argument('--number', type = int, default = 2000,
+        help = 'operations per benchmark')
+    parser.add_argument('--pages', type = int, default = 5,
+        help = 'citation pages served by the mock server')
+    parser.add_argument('--per-page', type = int, default = 100)
+    parser.add_argument('--latency', type = float, default = 0.0,
+        help = 'seconds the mock server waits per request')
+    parser.add_argument('--error-rate', type = float, default = 0.0,
+        help = 'share of mock requests answered with a 502')
+    parser.add_argument('--skip-network', action = 'store_true')
+    parser.add_argument('--output', help = 'write JSON here, not stdout')
+    args = parser.parse_args(argv)
+
+    results = parsing_benchmarks(args.number)
+    if not args.skip_network:
+        results.extend(network_benchmarks(args.number, args.pages,
+            args.per_page, args.latency, args.error_rate))
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'json_decoder': decoder.decoder_name(),
+        'settings': vars(args),
+        'results': results,
+    }
+    text = json.dumps(report, indent = 2, sort_keys = True)
+    if args.output:
+        with open(args.output, 'w') as fo:
+            fo.write(text + '\n')
+    else:
+        print(text)
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Streaming aggregations over article feeds.
+
+The operators here consume articles one at a time, so they work equally
+on a live articles_from_timeframe crawl and on a saved dump read back with
+ndjson.read_articles, parallel.parse_ndjson or a Snapshot. Memory use does
+not grow with the length of the feed: TopK keeps k articles per group and
+RunningStats keeps a fixed-accuracy quantile sketch.
+
+    top = TopK(500, 'cited_by_tweeters_count', group_by = 'journal')
+    stats = RunningStats('score')
+    aggregate(api.articles_from_timeframe('1w'), top, stats)
+"""
+
+import heapq
+import itertools
+import math
+
+from pyaltmetric import Article, ARTICLE_FIELDS, IncorrectInput
+
+def _check_field(name):
+    if name not in ARTICLE_FIELDS:
+        raise IncorrectInput("Unknown article field %s." % name)
+    return name
+
+def _article(article):
+    """Wrap raw dictionaries so everything can be read by attribute."""
+    return Article(article) if isinstance(article, dict) else article
+
+def threshold(articles, field, minimum):
+    """
+    Yield the articles whose field is at least minimum. Articles missing
+    the field are dropped.
+    """
+    _check_field(field)
+    for article in articles:
+        article = _article(article)
+        value = getattr(article, field)
+        if value is not None and value >= minimum:
+            yield article
+
+def aggregate(articles, *aggregators):
+    """
+    Feed every article to each aggregator in a single pass. Return the
+    number of articles read.
+    """
+    count = 0
+    for article in articles:
+        article = _article(article)
+        for aggregator in aggregators:
+            aggregator.add(article)
+        count += 1
+    return count
+
+class TopK(object):
+    def __init__(self, k, field = 'score', group_by = None, minimum = None):
+        """
+        Keep the k articles with the largest value of a numeric field.
+
+        :param field: Article attribute to rank by, e.g. 'score' or
+            'cited_by_tweeters_count'. Articles without it are skipped.
+        :param group_by: Article attribute to keep a separate top k for,
+            e.g. 'journal'. When its value is a list, as for 'subjects',
+            the article counts towards every group in it.
+        :param minimum: Skip articles whose field is below this.
+        """
+        if k < 1:
+            raise IncorrectInput("k must be at least 1.")
+        self.k = k
+        self.field = _check_field(field)
+        self.group_by = group_by if group_by is None else \
+            _check_field(group_by)
+        self.minimum = minimum
+        self.seen = 0
+        self._heaps = {}
+        #Breaks ties in arrival order so articles are never compared.
+        self._order = itertools.count()
+
+    def add(self, article):
+        article = _article(article)
+        value = getattr(article, self.field)
+        if value is None or (self.minimum is not None and
+            value < self.minimum):
+            return
+        self.seen += 1
+        if self.group_by is None:
+            groups = (None,)
+        else:
+            groups = getattr(article, self.group_by)
+            if not isinstance(groups, (list, tuple)):
+                groups = (groups,)
+        entry = (value, -next(self._order), article)
+        for group in groups:
+            heap = self._heaps.setdefault(group, [])
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    def update(self, articles):
+        """Add every article of an iterable. Return self."""
+        for article in articles:
+            self.add(article)
+        return self
+
+    def results(self):
+        """
+        Return the kept articles, largest first. With group_by, return a
+        dictionary of group -> list instead.
+        """
+        ranked = dict((group, [entry[2] for entry in
+            sorted(heap, key = lambda entry: entry[:2], reverse = True)])
+            for group, heap in self._heaps.items())
+        if self.group_by is None:
+            return ranked.get(None, [])
+        return ranked
+
+class QuantileSketch(object):
+    """
+    Mergeable quantile sketch with relative error guarantees. Values are
+    counted in logarithmic buckets, as in DDSketch: any quantile is
+    returned within relative_accuracy of an actual value of that rank,
+    and the number of buckets only grows with the logarithm of the range.
+    """
+    def __init__(self, relative_accuracy = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+        self._zeros = 0
+        self.count = 0
+
+    def _index(self, magnitude):
+        return int(math.ceil(math.log(magnitude) / self._log_gamma))
+
+    def _value(self, index):
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value):
+        if value > 0:
+            index = self._index(value)
+            self._positive[index] = self._positive.get(index, 0) + 1
+        elif value < 0:
+            index = self._index(-value)
+            self._negative[index] = self._negative.get(index, 0) + 1
+        else:
+            self._zeros += 1
+        self.count += 1
+
+    def quantile(self, q):
+        """Return the q quantile, 0 <= q <= 1, or None when empty."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self._negative, reverse = True):
+            seen += self._negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self._zeros
+        if seen > rank:
+            return 0.0
+        for index in sorted(self._positive):
+            seen += self._positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self._positive))
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches of different accuracy.")
+        for mine, theirs in ((self._positive, other._positive),
+            (self._negative, other._negative)):
+            for index, count in theirs.items():
+                mine[index] = mine.get(index, 0) + count
+        self._zeros += other._zeros
+        self.count += other.count
+        return self
+
+class RunningStats(object):
+    def __init__(self, field = 'score', relative_accuracy = 0.01):
+        """
+        Running count, sum, minimum, maximum, mean and percentiles of a
+        numeric field. Percentiles come from a QuantileSketch and are
+        within relative_accuracy of the exact value.
+        """
+        self.field = _check_field(field)
+        self.count = 0
+        self.missing = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, article):
+        value = getattr(_article(article), self.field)
+        if value is None:
+            self.missing += 1
+            return
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self.sketch.add(value)
+
+    def update(self, articles):
+        """Add every article of an iterable. Return self."""
+        for article in articles:
+            self.add(article)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p):
+        """Return the p-th percentile, 0 <= p <= 100."""
+        return self.sketch.quantile(p / 100.0)
+
+    def merge(self, other):
+        """Combine with the stats of another shard or dump."""
+        if other.field != self.field:
+            raise IncorrectInput("Cannot merge stats of different fields.")
+        self.count += other.count
+        self.missing += other.missing
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+        self.sketch.merge(other.sketch)
+        return self
+
+    def snapshot(self, percentiles = (50, 90, 99)):
+        """Return the statistics as a plain dictionary."""
+        return {
+            'field': self.field,
+            'count': self.count,
+            'missing': self.missing,
+            'sum': self.total,
+            'min': self.minimum,
+            'max': self.maximum,
+            'mean': self.mean,
+            'percentiles': dict((p, self.percentile(p)) for p in percentiles),
+        }
@@ -0,0 +1,286 @@
+"""
+Columnar storage for many articles.
+
+An ArticleBatch keeps the numeric attributes of many articles in typed
+arrays, one per attribute, instead of one Python object per article.
+Missing values are stored as NaN. Journals and subjects are dictionary
+encoded: each distinct value is stored once and rows hold integer codes.
+
+Columns are stdlib array.array objects. If numpy is installed,
+ArticleBatch.to_numpy turns a column into a numpy array without copying,
+and take, filter, sort, top_k and sum work on whole columns with numpy
+instead of looping over rows in Python.
+"""
+
+import array
+import heapq
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pyaltmetric import IncorrectInput
+
+#Column name -> raw keys to read. Like Article, later keys are only used
+#when the earlier ones are falsy.
+NUMERIC_COLUMNS = (
+    ('score', ('score',)),
+    ('cited_by_facebook_walls_count', ('cited_by_fbwalls_count',)),
+    ('cited_by_redits_count', ('cited_by_rdts_count',)),
+    ('cited_by_tweeters_count', ('cited_by_tweeters_count',)),
+    ('cited_by_google_plus_count', ('cited_by_gplus_count',)),
+    ('cited_by_msm_count', ('cited_by_msm_count',)),
+    ('cited_by_delicious_count', ('cited_by_delicious_count',)),
+    ('cited_by_qs_count', ('cited_by_qs_count',)),
+    ('cited_by_posts_count', ('cited_by_posts_count',)),
+    ('cited_by_accounts_count',
+        ('cited_by_accounts_count', 'by_accounts_count')),
+    ('cited_by_forums_count', ('cited_by_forums_count',)),
+    ('cited_by_peer_review_sites_count',
+        ('cited_by_peer_review_sites_count',)),
+    ('cited_by_feeds_count', ('cited_by_feeds_count',)),
+    ('cited_by_videos_count', ('cited_by_videos_count',)),
+    ('readers_count', ('readers_count',)),
+    #UNIX timestamps.
+    ('added_on', ('added_on',)),
+    ('published_on', ('published_on',)),
+    ('last_updated', ('last_updated',)),
+)
+
+#Keys of the raw 'history' dictionary, stored as history_<key> columns.
+HISTORY_PERIODS = ('at', '1d', '2d', '3d', '4d', '5d', '6d', '1w', '1m',
+    '3m', '6m', '1y')
+
+NAN = float('nan')
+
+class ArticleBatch(object):
+    """A read-only, column oriented view over many articles."""
+    def __init__(self, columns, dois, altmetric_ids, journal_codes,
+        journals, subject_offsets, subject_codes, subjects):
+        """Use from_raw or from_articles instead."""
+        self._columns = columns
+        self._dois = dois
+        self._altmetric_ids = altmetric_ids
+        self._journal_codes = journal_codes
+        self._journals = journals
+        self._subject_offsets = subject_offsets
+        self._subject_codes = subject_codes
+        self._subjects = subjects
+
+    @classmethod
+    def from_raw(cls, raw_dicts):
+        """Build a batch from an iterable of Altmetric JSON dictionaries."""
+        columns = dict((name, array.array('d')) for name, keys
+            in NUMERIC_COLUMNS)
+        for period in HISTORY_PERIODS:
+            columns['history_' + period] = array.array('d')
+        dois = []
+        altmetric_ids = []
+        journal_codes = array.array('l')
+        journal_lookup = {}
+        subject_offsets = array.array('l', [0])
+        subject_codes = array.array('l')
+        subject_lookup = {}
+
+        for raw in raw_dicts:
+            if not raw:
+                continue
+            for name, keys in NUMERIC_COLUMNS:
+                for key in keys:
+                    value = raw.get(key)
+                    if value:
+                        break
+                columns[name].append(NAN if value is None else value)
+
+            history = raw.get('history') or {}
+            for period in HISTORY_PERIODS:
+                value = history.get(period)
+                columns['history_' + period].append(
+                    NAN if value is None else value)
+
+            dois.append(raw.get('doi'))
+            altmetric_ids.append(str(raw.get('altmetric_id', "")))
+            journal = raw.get('journal')
+            journal_codes.append(
+                journal_lookup.setdefault(journal, len(journal_lookup)))
+            for subject in raw.get('subjects') or ():
+                subject_codes.append(
+                    subject_lookup.setdefault(subject, len(subject_lookup)))
+            subject_offsets.append(len(subject_codes))
+
+        return cls(columns, dois, altmetric_ids, journal_codes,
+            _decode_table(journal_lookup), subject_offsets, subject_codes,
+            _decode_table(subject_lookup))
+
+    @classmethod
+    def from_articles(cls, articles):
+        """
+        Build a batch from Article objects, e.g. the generator returned by
+        Altmetric.articles_from_timeframe. None entries are skipped.
+        """
+        return cls.from_raw(article.raw_dictionary for article in articles
+            if article is not None)
+
+    def __len__(self):
+        return len(self._dois)
+
+    @property
+    def column_names(self):
+        return sorted(self._columns)
+
+    def column(self, name):
+        """Return the array holding a numeric column."""
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise IncorrectInput("Unknown column %s." % name)
+
+    def to_numpy(self, name):
+        """Return a numeric column as a numpy array sharing its memory."""
+        if numpy is None:
+            raise ImportError("ArticleBatch.to_numpy requires numpy.")
+        return _as_numpy(self.column(name))
+
+    @property
+    def dois(self):
+        return self._dois
+
+    @property
+    def altmetric_ids(self):
+        return self._altmetric_ids
+
+    @property
+    def journals(self):
+        """Return the journal of every row."""
+        return [self._journals[code] for code in self._journal_codes]
+
+    def subjects(self, row):
+        """Return the list of subjects of one row."""
+        start = self._subject_offsets[row]
+        end = self._subject_offsets[row + 1]
+        return [self._subjects[code] for code in self._subject_codes[start:end]]
+
+    def take(self, rows):
+        """Return a new batch with only the given row positions, in order."""
+        if numpy is not None:
+            indices = numpy.asarray(list(rows), dtype = numpy.intp)
+            columns = dict((name, array.array('d',
+                _as_numpy(values)[indices].tobytes()))
+                for name, values in self._columns.items())
+            rows = indices.tolist()
+        else:
+            rows = list(rows)
+            columns = dict((name, array.array('d', [values[r] for r in rows]))
+                for name, values in self._columns.items())
+        subject_offsets = array.array('l', [0])
+        subject_codes = array.array('l')
+        for row in rows:
+            subject_codes.extend(self._subject_codes[
+                self._subject_offsets[row]:self._subject_offsets[row + 1]])
+            subject_offsets.append(len(subject_codes))
+        return ArticleBatch(columns,
+            [self._dois[r] for r in rows],
+            [self._altmetric_ids[r] for r in rows],
+            array.array('l', [self._journal_codes[r] for r in rows]),
+            self._journals, subject_offsets, subject_codes, self._subjects)
+
+    def filter(self, name, predicate):
+        """
+        Return a batch of the rows whose value in column name satisfies
+        predicate. Missing (NaN) values never match.
+
+        With numpy, predicate is first called once with the whole column as
+        a numpy array, so comparisons such as lambda v: v > 4 give a mask
+        directly. Predicates that do not return a boolean array of the
+        column's shape are called for every value instead.
+        """
+        values = self.column(name)
+        if numpy is not None:
+            mask = _column_mask(predicate, _as_numpy(values))
+            if mask is not None:
+                return self.take(numpy.flatnonzero(mask))
+        return self.take(row for row, value in enumerate(values)
+            if not math.isnan(value) and predicate(value))
+
+    def sort(self, name, reverse = False):
+        """Return a batch sorted on a column. Missing values sort last."""
+        values = self.column(name)
+        if numpy is not None:
+            #numpy sorts NaN last either way; a stable sort keeps ties in
+            #row order, like list.sort.
+            column = _as_numpy(values)
+            return self.take(numpy.argsort(-column if reverse else column,
+                kind = 'stable'))
+        present = [row for row, value in enumerate(values)
+            if not math.isnan(value)]
+        missing = [row for row, value in enumerate(values)
+            if math.isnan(value)]
+        present.sort(key = values.__getitem__, reverse = reverse)
+        return self.take(present + missing)
+
+    def top_k(self, name, k):
+        """Return the k rows with the largest values in a column."""
+        values = self.column(name)
+        if numpy is not None:
+            return self.take(_top_rows(_as_numpy(values), k))
+        rows = (row for row, value in enumerate(values)
+            if not math.isnan(value))
+        return self.take(heapq.nlargest(k, rows, key = values.__getitem__))
+
+    def group_by_journal(self):
+        """Return a dictionary mapping each journal to a batch of its rows."""
+        groups = {}
+        for row, code in enumerate(self._journal_codes):
+            groups.setdefault(code, []).append(row)
+        return dict((self._journals[code], self.take(rows))
+            for code, rows in groups.items())
+
+    def sum(self, name):
+        """Sum a column, ignoring missing values."""
+        if numpy is not None:
+            return float(numpy.nansum(_as_numpy(self.column(name))))
+        return math.fsum(v for v in self.column(name) if not math.isnan(v))
+
+def _decode_table(lookup):
+    table = [None] * len(lookup)
+    for value, code in lookup.items():
+        table[code] = value
+    return table
+
+def _as_numpy(values):
+    """View an array('d') column as a numpy array."""
+    if not len(values):
+        return numpy.empty(0)
+    return numpy.frombuffer(values, dtype = numpy.float64)
+
+def _column_mask(predicate, column):
+    """
+    Return predicate applied to a whole column with NaN rows cleared, or
+    None when predicate does not work on arrays.
+    """
+    try:
+        mask = predicate(column)
+    except (TypeError, ValueError):
+        return None
+    if (getattr(mask, 'shape', None) != column.shape
+        or getattr(mask, 'dtype', None) != numpy.bool_):
+        return None
+    return mask & ~numpy.isnan(column)
+
+def _top_rows(column, k):
+    """
+    Rows of the k largest values, largest first. Ties are kept in row
+    order, as heapq.nlargest does.
+    """
+    present = numpy.flatnonzero(~numpy.isnan(column))
+    if k < 1:
+        return present[:0]
+    if k < len(present):
+        values = column[present]
+        kth = numpy.partition(values, len(values) - k)[len(values) - k]
+        above = present[values > kth]
+        ties = present[values == kth][:k - len(above)]
+        present = numpy.concatenate((above, ties))
+    return present[numpy.argsort(-column[present], kind = 'stable')]
@@ -0,0 +1,181 @@
+"""
+Response caches for the Altmetric clients.
+
+A cache maps a key built from the API method, identifier and query
+parameters to the decoded JSON dictionary Altmetric returned. Empty
+dictionaries (404 and 400 answers) are cached too, with their own TTL.
+The ETag and Last-Modified headers of an answer are kept in an entry of
+their own next to it, so cached dictionaries stay exactly as Altmetric
+sent them.
+"""
+
+import collections
+import json
+import sqlite3
+import threading
+import time
+
+from pyaltmetric import decoder
+
+def cache_key(method, args, params):
+    """Build a cache key from a request. The API key is left out."""
+    params = sorted((k, v) for k, v in params.items()
+        if k != 'key' and v is not None)
+    return json.dumps([method, [str(a) for a in args], params])
+
+def _validators_key(key):
+    return key + " validators"
+
+class CacheBackend(object):
+    """
+    Base class for caches. Subclasses implement get, set and clear; the
+    base class picks TTLs and keeps hit and miss counts.
+    """
+    def __init__(self, ttl = 3600, negative_ttl = 300):
+        """
+        :param ttl: Seconds to keep articles. None keeps them forever.
+        :param negative_ttl: Seconds to keep 'not found' answers. 0 turns
+            negative caching off.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """Return the stored dictionary, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store a dictionary for ttl seconds (forever if ttl is None)."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every entry."""
+        raise NotImplementedError
+
+    def lookup(self, key):
+        """Like get, but counts hits and misses."""
+        value = self.get(key)
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def store(self, key, value, validators = None):
+        """
+        Store an API answer using the positive or negative TTL.
+
+        :param validators: The answer's ETag and Last-Modified headers, for
+            lookup_validators.
+        """
+        ttl = self.ttl if value else self.negative_ttl
+        if ttl == 0:
+            return
+        self.set(key, value, ttl)
+        if value and validators:
+            self.set(_validators_key(key), validators, ttl)
+
+    def lookup_validators(self, key):
+        """
+        Return the validators stored with an answer, or None. Hits and
+        misses are not counted.
+        """
+        return self.get(_validators_key(key))
+
+    @staticmethod
+    def _expires(ttl):
+        if ttl is None:
+            return None
+        return time.time() + ttl
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def stats(self):
+        """Return a dictionary with hit and miss counts."""
+        return {'hits': self._hits, 'misses': self._misses}
+
+class MemoryCache(CacheBackend):
+    """In-process cache evicting the least recently used entry when full."""
+    def __init__(self, max_size = 1024, ttl = 3600, negative_ttl = 300):
+        super(MemoryCache, self).__init__(ttl, negative_ttl)
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (self._expires(ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last = False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCache(CacheBackend):
+    """Cache stored in an sqlite database so it survives restarts."""
+    def __init__(self, path, ttl = 86400, negative_ttl = 3600):
+        super(SQLiteCache, self).__init__(ttl, negative_ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread = False)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM responses "
+                "WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires = row
+            if expires is not None and expires < time.time():
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?",
+                        (key,))
+                return None
+        return decoder.loads(value)
+
+    def set(self, key, value, ttl):
+        value = json.dumps(value)
+        with self._lock:
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO responses "
+                    "VALUES (?, ?, ?)", (key, value, self._expires(ttl)))
+
+    def clear(self):
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
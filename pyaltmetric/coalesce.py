@@ -0,0 +1,51 @@
+"""
+Request coalescing for the blocking Altmetric client.
+
+When several threads ask for the same thing at once, only the first one
+does the work. The others wait for it and receive the same result, or
+the same exception.
+"""
+
+import concurrent.futures
+import threading
+
+class SingleFlight(object):
+    """Run at most one call per key at a time, sharing its outcome."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._shared = 0
+
+    def do(self, key, function):
+        """Return function(), or the result of an identical call in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+            else:
+                self._shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @property
+    def shared(self):
+        """Number of calls answered by another caller's request."""
+        return self._shared
+
+    def __len__(self):
+        """Number of calls currently in flight."""
+        return len(self._calls)
@@ -0,0 +1,201 @@
+"""
+Resumable timeframe crawls.
+
+TimeframeCrawler walks the pages of a citations query like
+Altmetric.articles_from_timeframe, but after every page it appends the new
+results to an NDJSON file and records the query and the next page in a
+checkpoint file. If the process dies, or a failure outlasts the retries,
+running a crawler with the same checkpoint carries on from the first page
+that was not saved.
+
+Articles gain and lose mentions while a long crawl runs, so one can move
+onto a later page and be served twice. Results are de-duplicated on their
+Altmetric ID.
+"""
+
+import json
+import os
+import time
+
+import requests
+
+from pyaltmetric import AltmetricHTTPException, IncorrectInput, decoder
+from pyaltmetric.ndjson import read_articles, write_articles
+from pyaltmetric.ratelimit import RETRY_STATUS_CODES, backoff_delay
+
+CHECKPOINT_VERSION = 1
+
+def is_transient(exception):
+    """Return True for failures worth retrying later."""
+    if isinstance(exception, AltmetricHTTPException):
+        return exception.status_code in RETRY_STATUS_CODES
+    return isinstance(exception, (requests.exceptions.Timeout,
+        requests.exceptions.ConnectionError))
+
+def _query(timeframe, num_results, doi_prefix, nlmid, subjects, cited_in):
+    """The query as it is stored in a checkpoint."""
+    def as_list(value):
+        if value is None or isinstance(value, str):
+            return value
+        return list(value)
+    return {
+        'timeframe': timeframe,
+        'num_results': num_results,
+        'doi_prefix': doi_prefix,
+        'nlmid': as_list(nlmid),
+        'subjects': as_list(subjects),
+        'cited_in': as_list(cited_in),
+    }
+
+class TimeframeCrawler(object):
+    def __init__(self, client, timeframe, checkpoint, num_results = 100,
+        doi_prefix = None, nlmid = None, subjects = None, cited_in = None,
+        page = 1, last_page = None, results = None, max_attempts = 5,
+        backoff_factor = 1, max_backoff = 300):
+        """
+        Start a crawl, or resume the one recorded in checkpoint.
+
+        :param client: An Altmetric instance.
+        :param timeframe: As for articles_from_timeframe, along with
+            num_results, doi_prefix, nlmid, subjects and cited_in. When
+            resuming they must match the checkpoint.
+        :param checkpoint: Filename of the JSON checkpoint.
+        :param page: Page to start a new crawl at.
+        :param last_page: Last page to fetch. Defaults to every page.
+        :param results: Filename of the NDJSON results. Defaults to the
+            checkpoint name with a .results.ndjson extension.
+        :param max_attempts: Tries per page when failures are transient
+            (rate limits, gateway errors, timeouts). These come on top of
+            the client's own retries.
+        """
+        self.client = client
+        self.checkpoint = checkpoint
+        self.results = results or \
+            os.path.splitext(checkpoint)[0] + '.results.ndjson'
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.last_page = last_page
+        self.query = _query(client._check_timeframe(timeframe), num_results,
+            doi_prefix, nlmid, subjects, cited_in)
+        self._seen = set()
+
+        if os.path.exists(checkpoint):
+            self._load()
+        else:
+            self.page = page
+            self.done = False
+            self.count = 0
+            self.duplicates = 0
+            self._results_size = 0
+            open(self.results, 'w').close()
+            self._save()
+
+    def _load(self):
+        with open(self.checkpoint) as fi:
+            state = json.load(fi)
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise IncorrectInput("Unsupported checkpoint version.")
+        if (state['query'] != self.query
+            or state.get('last_page') != self.last_page):
+            raise IncorrectInput("%s was written for a different query."
+                % self.checkpoint)
+        self.page = state['page']
+        self.done = state['done']
+        self.count = state['count']
+        self.duplicates = state['duplicates']
+        self._results_size = state['results_size']
+
+        #Drop results written after the last checkpoint; their page will
+        #be fetched again.
+        with open(self.results, 'r+b') as fo:
+            fo.truncate(self._results_size)
+        with open(self.results, encoding = 'utf-8') as fi:
+            for line in fi:
+                if line.strip():
+                    self._remember(decoder.loads(line))
+
+    def _save(self):
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'query': self.query,
+            'last_page': self.last_page,
+            'page': self.page,
+            'done': self.done,
+            'count': self.count,
+            'duplicates': self.duplicates,
+            'results_size': self._results_size,
+        }
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w') as fo:
+            json.dump(state, fo)
+            fo.flush()
+            os.fsync(fo.fileno())
+        os.replace(temporary, self.checkpoint)
+
+    def _remember(self, raw):
+        """Return False if raw was seen before, else remember it."""
+        altmetric_id = raw.get('altmetric_id')
+        if altmetric_id is None:
+            return True
+        altmetric_id = str(altmetric_id)
+        if altmetric_id in self._seen:
+            return False
+        self._seen.add(altmetric_id)
+        return True
+
+    def _fetch(self, page):
+        query = dict(self.query)
+        timeframe = query.pop('timeframe')
+        attempt = 0
+        while True:
+            try:
+                return self.client._get_altmetrics('citations', timeframe,
+                    page = page, **query)
+            except (AltmetricHTTPException, requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError) as e:
+                attempt += 1
+                if not is_transient(e) or attempt >= self.max_attempts:
+                    raise
+                time.sleep(backoff_delay(attempt, self.backoff_factor,
+                    self.max_backoff))
+
+    def run(self):
+        """
+        Fetch the remaining pages, yielding each new Article. Every page is
+        saved before its articles are yielded.
+        """
+        while not self.done:
+            if self.last_page is not None and self.page > self.last_page:
+                raw_json = None
+            else:
+                raw_json = self._fetch(self.page)
+            if not raw_json:
+                self.done = True
+                self._save()
+                break
+
+            new = []
+            for result in raw_json.get('results', []):
+                if self._remember(result):
+                    new.append(result)
+                else:
+                    self.duplicates += 1
+
+            with open(self.results, 'a', encoding = 'utf-8') as fo:
+                write_articles(new, fo)
+                fo.flush()
+                os.fsync(fo.fileno())
+                self._results_size = fo.tell()
+            self.page += 1
+            self.count += len(new)
+            self._save()
+
+            for result in new:
+                article = self.client._create_article(result)
+                if article is not None:
+                    yield article
+
+    def articles(self):
+        """Yield every Article saved so far, in crawl order."""
+        return read_articles(self.results)
@@ -0,0 +1,151 @@
+"""
+Instrumentation hooks for the Altmetric clients.
+
+Register RequestObserver instances with a client to be told about every
+request, response, error and parsed article. MetricsAggregator is a
+ready made observer that keeps counters and latency histograms.
+"""
+
+import bisect
+import threading
+
+class RequestEvent(object):
+    """
+    What is known about one HTTP request. Timings are in seconds and are
+    None until measured.
+
+    time_to_headers covers connecting, sending the request and waiting
+    for the response headers; requests does not expose the connect time on
+    its own. transfer_time covers reading the body and decode_time turning
+    it into a dictionary.
+    """
+    __slots__ = ('method', 'identifier', 'url', 'params', 'attempt',
+        'status_code', 'bytes', 'time_to_headers', 'transfer_time',
+        'decode_time')
+
+    def __init__(self, method, identifier, url, params):
+        self.method = method
+        self.identifier = identifier
+        self.url = url
+        self.params = params
+        self.start_attempt(0)
+
+    def start_attempt(self, attempt):
+        """Forget what was measured for the previous attempt."""
+        self.attempt = attempt
+        self.status_code = None
+        self.bytes = None
+        self.time_to_headers = None
+        self.transfer_time = None
+        self.decode_time = None
+
+    @property
+    def total_time(self):
+        return sum(t for t in (self.time_to_headers, self.transfer_time,
+            self.decode_time) if t is not None)
+
+class RequestObserver(object):
+    """Base class for observers. Override the callbacks you need."""
+    def before_request(self, event):
+        """Called before each attempt is sent."""
+        pass
+
+    def after_response(self, event):
+        """Called when an attempt got a response, whatever its status."""
+        pass
+
+    def on_error(self, event, exception):
+        """Called when an attempt fails with an exception."""
+        pass
+
+    def on_parse(self, article, seconds):
+        """
+        Called after an article is built from a dictionary. seconds covers
+        construction only: an Article parses each attribute on first
+        access, so it is near zero unless fields were given and a
+        CompactArticle was built.
+        """
+        pass
+
+#Upper bounds, in seconds, of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0)
+
+class Histogram(object):
+    """Latency histogram with fixed bucket bounds. Counts are per bucket."""
+    def __init__(self, buckets = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        bounds = [str(b) for b in self.buckets] + ['+Inf']
+        return {'buckets': dict(zip(bounds, self.counts)),
+            'sum': self.total, 'count': self.count}
+
+class MetricsAggregator(RequestObserver):
+    """
+    Observer keeping request, status, error and byte counters plus latency
+    histograms per timing phase. snapshot() returns plain dictionaries that
+    can be pushed to a metrics system. parse_time is the construction time
+    reported to on_parse.
+    """
+    PHASES = ('time_to_headers', 'transfer_time', 'decode_time', 'total_time')
+
+    def __init__(self, buckets = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.statuses = {}
+            self.errors = {}
+            self.bytes = 0
+            self.articles = 0
+            self.histograms = dict((phase, Histogram(self._buckets))
+                for phase in self.PHASES + ('parse_time',))
+
+    def before_request(self, event):
+        with self._lock:
+            self.requests[event.method] = \
+                self.requests.get(event.method, 0) + 1
+
+    def after_response(self, event):
+        with self._lock:
+            self.statuses[event.status_code] = \
+                self.statuses.get(event.status_code, 0) + 1
+            self.bytes += event.bytes or 0
+            for phase in self.PHASES:
+                value = getattr(event, phase)
+                if value is not None:
+                    self.histograms[phase].observe(value)
+
+    def on_error(self, event, exception):
+        name = type(exception).__name__
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def on_parse(self, article, seconds):
+        with self._lock:
+            self.articles += 1
+            self.histograms['parse_time'].observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'statuses': dict(self.statuses),
+                'errors': dict(self.errors),
+                'bytes': self.bytes,
+                'articles': self.articles,
+                'latency': dict((phase, histogram.snapshot())
+                    for phase, histogram in self.histograms.items()),
+            }
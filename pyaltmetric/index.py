@@ -0,0 +1,188 @@
+"""
+A persistent local index of articles.
+
+ArticleIndex stores articles in an sqlite database with B-tree indexes on
+every identifier (DOI, PMID, arXiv ID, ADS bibcode, Altmetric ID and
+ISSN) and on score, added_on and published_on, so lookups and range
+queries take O(log n). Passing an index to Altmetric makes the
+article_from_* methods answer from it before going to the network.
+"""
+
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+from pyaltmetric import Article, IncorrectInput, decoder
+
+#Lookup method name -> column holding that identifier.
+IDENTIFIER_COLUMNS = {
+    'doi': 'doi',
+    'pmid': 'pmid',
+    'arxiv': 'arxiv_id',
+    'ads': 'ads_id',
+    'id': 'altmetric_id',
+}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles ("
+    " altmetric_id TEXT PRIMARY KEY, doi TEXT COLLATE NOCASE, pmid TEXT,"
+    " arxiv_id TEXT, ads_id TEXT, score REAL, added_on INTEGER,"
+    " published_on INTEGER, last_updated INTEGER, raw TEXT)",
+    "CREATE TABLE IF NOT EXISTS issns ("
+    " issn TEXT, altmetric_id TEXT, PRIMARY KEY (issn, altmetric_id))",
+    "CREATE INDEX IF NOT EXISTS articles_doi ON articles (doi)",
+    "CREATE INDEX IF NOT EXISTS articles_pmid ON articles (pmid)",
+    "CREATE INDEX IF NOT EXISTS articles_arxiv_id ON articles (arxiv_id)",
+    "CREATE INDEX IF NOT EXISTS articles_ads_id ON articles (ads_id)",
+    "CREATE INDEX IF NOT EXISTS articles_score ON articles (score)",
+    "CREATE INDEX IF NOT EXISTS articles_added_on ON articles (added_on)",
+    "CREATE INDEX IF NOT EXISTS articles_published_on "
+    " ON articles (published_on)",
+    "CREATE INDEX IF NOT EXISTS issns_altmetric_id ON issns (altmetric_id)",
+)
+
+def _timestamp(value):
+    """Accept a datetime or a UNIX timestamp, return a UNIX timestamp."""
+    if isinstance(value, datetime.datetime):
+        return time.mktime(value.timetuple())
+    return value
+
+class ArticleIndex(object):
+    def __init__(self, path = ':memory:'):
+        """Open or create an index stored at path."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread = False)
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def add(self, article):
+        """Add or replace one Article or raw dictionary."""
+        return self.add_many([article])
+
+    def add_many(self, articles):
+        """
+        Add or replace Articles or raw dictionaries in one transaction,
+        e.g. straight from articles_from_timeframe. Entries without an
+        Altmetric ID are skipped. Return the number stored.
+        """
+        count = 0
+        with self._lock:
+            with self._db:
+                for article in articles:
+                    if article is None:
+                        continue
+                    raw = article if isinstance(article, dict) \
+                        else article.raw_dictionary
+                    if not raw or raw.get('altmetric_id') is None:
+                        continue
+                    altmetric_id = str(raw['altmetric_id'])
+                    self._db.execute("INSERT OR REPLACE INTO articles "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                        altmetric_id, raw.get('doi'), _text(raw.get('pmid')),
+                        raw.get('arxiv_id'), raw.get('ads_id'),
+                        raw.get('score'), raw.get('added_on'),
+                        raw.get('published_on'), raw.get('last_updated'),
+                        json.dumps(raw)))
+                    self._db.execute("DELETE FROM issns WHERE altmetric_id = ?",
+                        (altmetric_id,))
+                    self._db.executemany("INSERT OR IGNORE INTO issns "
+                        "VALUES (?, ?)", [(issn, altmetric_id)
+                        for issn in raw.get('issns') or ()])
+                    count += 1
+        return count
+
+    def lookup_raw(self, method, identifier):
+        """
+        Return the raw dictionary stored for an identifier, or None.
+
+        :param method: One of 'doi', 'pmid', 'arxiv', 'ads' or 'id', as
+            used by the Altmetric API.
+        """
+        try:
+            column = IDENTIFIER_COLUMNS[method]
+        except KeyError:
+            raise IncorrectInput("Cannot look articles up by %s." % method)
+        rows = self._query("SELECT raw FROM articles WHERE %s = ? LIMIT 1"
+            % column, (str(identifier),))
+        return decoder.loads(rows[0][0]) if rows else None
+
+    def lookup(self, method, identifier):
+        """Return the stored Article for an identifier, or None."""
+        raw = self.lookup_raw(method, identifier)
+        return Article(raw) if raw else None
+
+    def by_doi(self, doi):
+        return self.lookup('doi', doi)
+
+    def by_pmid(self, pmid):
+        return self.lookup('pmid', pmid)
+
+    def by_arxiv(self, arxiv_id):
+        return self.lookup('arxiv', arxiv_id)
+
+    def by_ads(self, ads_bibcode):
+        return self.lookup('ads', ads_bibcode)
+
+    def by_altmetric_id(self, altmetric_id):
+        return self.lookup('id', altmetric_id)
+
+    def by_issn(self, issn):
+        """Return every stored article published under an ISSN."""
+        return self._articles("SELECT a.raw FROM issns i JOIN articles a "
+            "ON a.altmetric_id = i.altmetric_id WHERE i.issn = ?", (issn,))
+
+    def score_between(self, low = None, high = None):
+        """Return articles with low <= score <= high, highest first."""
+        return self._range('score', low, high, "score DESC")
+
+    def added_between(self, start = None, end = None):
+        """Return articles added between two datetimes or timestamps."""
+        return self._range('added_on', _timestamp(start), _timestamp(end),
+            "added_on")
+
+    def published_between(self, start = None, end = None):
+        """Return articles published between two datetimes or timestamps."""
+        return self._range('published_on', _timestamp(start),
+            _timestamp(end), "published_on")
+
+    def _range(self, column, low, high, order):
+        clauses = ["%s IS NOT NULL" % column]
+        params = []
+        if low is not None:
+            clauses.append("%s >= ?" % column)
+            params.append(low)
+        if high is not None:
+            clauses.append("%s <= ?" % column)
+            params.append(high)
+        return self._articles("SELECT raw FROM articles WHERE %s ORDER BY %s"
+            % (" AND ".join(clauses), order), params)
+
+    def _articles(self, sql, params):
+        return [Article(decoder.loads(raw)) for raw, in
+            self._query(sql, params)]
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+def _text(value):
+    return None if value is None else str(value)
@@ -0,0 +1,142 @@
+"""
+Incremental parsing of the objects in a JSON array.
+
+ResultsScanner is fed a JSON document such as a citations page a chunk at
+a time. It finds the array under one top level key and hands back every
+object in it once the object is complete.
+
+Outside the array the scanner only follows quotes, brackets and braces.
+Inside it, each element is handed to the C accelerated raw_decode of the
+standard json module. An element that is still incomplete is tried again
+once the data buffered for it has doubled, so a large element costs
+linear time overall.
+"""
+
+import codecs
+import json
+import re
+
+_STRUCTURE = re.compile(r'["{}\[\]:]')
+_STRING = re.compile(r'["\\]')
+_SEPARATORS = re.compile(r'[\s,]*')
+_DECODER = json.JSONDecoder()
+
+class ResultsScanner(object):
+    def __init__(self, key = 'results'):
+        """:param key: Top level key holding the array of objects."""
+        self._key = key
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._text = ''
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = None
+        self._last_string = None
+        self._in_array = False
+        self._array_done = False
+        self._retry_at = 0
+        self._started = False
+        self._finished = False
+        self.keys = 0
+
+    @property
+    def empty(self):
+        """True if the top level object has no keys."""
+        return self.keys == 0
+
+    def feed(self, data):
+        """Add bytes. Return the list of objects completed by them."""
+        text = self._text + self._utf8.decode(data)
+        position = self._position
+        items = []
+        while True:
+            if self._in_array:
+                position = _SEPARATORS.match(text, position).end()
+                if position >= len(text):
+                    break
+                if text[position] == ']':
+                    self._in_array = False
+                    self._array_done = True
+                    self._depth -= 1
+                    position += 1
+                    continue
+                if len(text) - position < self._retry_at:
+                    break
+                try:
+                    item, position = _DECODER.raw_decode(text, position)
+                except ValueError:
+                    self._retry_at = 2 * (len(text) - position)
+                    break
+                self._retry_at = 0
+                items.append(item)
+                continue
+
+            if self._in_string:
+                match = _STRING.search(text, position)
+                if match is None:
+                    position = len(text)
+                    break
+                if match.group() == '\\':
+                    if match.end() >= len(text):
+                        #The escaped character has not arrived yet.
+                        position = match.start()
+                        break
+                    position = match.end() + 1
+                    continue
+                self._in_string = False
+                if self._string_start is not None:
+                    self._last_string = text[self._string_start:match.start()]
+                position = match.end()
+                continue
+
+            match = _STRUCTURE.search(text, position)
+            if match is None:
+                position = len(text)
+                break
+            char = match.group()
+            position = match.end()
+            if char == '"':
+                self._in_string = True
+                self._string_start = position if self._depth == 1 else None
+            elif char == ':':
+                if self._depth == 1:
+                    self.keys += 1
+            elif char in '{[':
+                self._depth += 1
+                self._started = True
+                if (char == '[' and self._depth == 2
+                    and not self._array_done
+                    and self._last_string == self._key):
+                    self._in_array = True
+            else:
+                self._depth -= 1
+                if self._depth < 0:
+                    raise ValueError("Unbalanced JSON document.")
+                if self._depth == 0:
+                    self._finished = True
+
+        #Forget everything before the element or key being read.
+        keep = position
+        if self._in_string and self._string_start is not None:
+            keep = self._string_start
+        self._text = text[keep:]
+        self._position = position - keep
+        if self._in_string and self._string_start is not None:
+            self._string_start -= keep
+        else:
+            self._string_start = None
+        return items
+
+    def close(self):
+        """
+        Return the objects still waiting to be tried. Raise ValueError
+        unless a whole JSON document was fed.
+        """
+        self._retry_at = 0
+        items = self.feed(b'')
+        if self._in_array and self._text[self._position:].strip():
+            #Report why the last element does not decode.
+            _DECODER.raw_decode(self._text, self._position)
+        if not self._started or not self._finished or self._in_string:
+            raise ValueError("Incomplete JSON document.")
+        return items
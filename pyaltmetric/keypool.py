@@ -0,0 +1,144 @@
+"""
+Spreading requests over several API keys.
+
+A KeyPool holds API keys, each with its own RateLimiter, and hands one
+out for every request attempt. Keys answered with 403 or 420 are set aside
+for a while so the others carry the load. usage() reports what each key
+has done.
+"""
+
+import threading
+import time
+
+from pyaltmetric.ratelimit import RateLimiter
+
+#Answers that mean a key should not be used for a while.
+SIDELINE_STATUS_CODES = (403, 420)
+
+STRATEGIES = ('round_robin', 'least_loaded')
+
+class PooledKey(object):
+    """One API key of a KeyPool and its usage counters."""
+    def __init__(self, key, requests_per_hour = None):
+        self.key = key
+        self.requests_per_hour = requests_per_hour
+        self.limiter = None
+        if requests_per_hour:
+            self.limiter = RateLimiter.per_hour(requests_per_hour)
+        self.requests = 0
+        self.in_flight = 0
+        self.statuses = {}
+        self.errors = 0
+        self.sidelined = 0
+        self.sidelined_until = 0.0
+
+    def load(self):
+        """Requests in flight, then share of the hourly budget used."""
+        return (self.in_flight,
+            self.requests / (self.requests_per_hour or 1.0))
+
+class KeyPool(object):
+    def __init__(self, keys, strategy = 'round_robin', sideline_seconds = 300):
+        """
+        :param keys: API key strings, (key, requests_per_hour) pairs, or a
+            dictionary of key -> requests_per_hour. Keys without a budget
+            are not rate limited.
+        :param strategy: 'round_robin' takes the keys in turn.
+            'least_loaded' takes the key with the fewest requests in flight,
+            then the one that used the smallest share of its budget.
+        :param sideline_seconds: How long a key answered with 403 or 420 is
+            left out, unless the answer carried a Retry-After header.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError("strategy must be one of %s." %
+                ", ".join(STRATEGIES))
+        if isinstance(keys, dict):
+            keys = keys.items()
+        self._keys = []
+        for key in keys:
+            if isinstance(key, str):
+                key = (key, None)
+            self._keys.append(PooledKey(*key))
+        if not self._keys:
+            raise ValueError("A KeyPool needs at least one key.")
+        self.strategy = strategy
+        self.sideline_seconds = sideline_seconds
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def available(self):
+        """Number of keys not currently set aside."""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for k in self._keys if k.sidelined_until <= now)
+
+    def acquire(self):
+        """
+        Pick a key, wait for its rate limiter and return the PooledKey.
+        When every key is set aside, wait for the first to come back.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                ready = [k for k in self._keys if k.sidelined_until <= now]
+                if ready:
+                    chosen = self._choose(ready)
+                    chosen.requests += 1
+                    chosen.in_flight += 1
+                    break
+                wait = min(k.sidelined_until for k in self._keys) - now
+            time.sleep(wait)
+        if chosen.limiter is not None:
+            chosen.limiter.acquire()
+        return chosen
+
+    def _choose(self, ready):
+        if self.strategy == 'least_loaded':
+            return min(ready, key = PooledKey.load)
+        for i in range(len(self._keys)):
+            candidate = self._keys[(self._next + i) % len(self._keys)]
+            if candidate in ready:
+                self._next = (self._next + i + 1) % len(self._keys)
+                return candidate
+
+    def release(self, pooled_key, status_code = None, retry_after = None):
+        """
+        Record the outcome of a request made with pooled_key. status_code
+        is None when no response arrived. A 403 or 420 sets the key aside
+        for retry_after seconds, or sideline_seconds without it.
+        """
+        with self._lock:
+            pooled_key.in_flight -= 1
+            if status_code is None:
+                pooled_key.errors += 1
+                return
+            pooled_key.statuses[status_code] = \
+                pooled_key.statuses.get(status_code, 0) + 1
+        if status_code in SIDELINE_STATUS_CODES:
+            self.sideline(pooled_key, retry_after)
+
+    def sideline(self, pooled_key, seconds = None):
+        """Leave a key out for a while."""
+        if seconds is None:
+            seconds = self.sideline_seconds
+        with self._lock:
+            pooled_key.sidelined += 1
+            pooled_key.sidelined_until = max(pooled_key.sidelined_until,
+                time.monotonic() + seconds)
+
+    def usage(self):
+        """Return a dictionary of key -> usage counters."""
+        now = time.monotonic()
+        with self._lock:
+            return dict((k.key, {
+                'requests': k.requests,
+                'in_flight': k.in_flight,
+                'statuses': dict(k.statuses),
+                'errors': k.errors,
+                'sidelined': k.sidelined,
+                'available': k.sidelined_until <= now,
+                'requests_per_hour': k.requests_per_hour,
+            }) for k in self._keys)
@@ -0,0 +1,76 @@
+"""
+Streaming newline delimited JSON (NDJSON) reading and writing.
+
+Each line holds one Altmetric JSON dictionary. Files whose name ends in
+.gz are compressed and decompressed transparently. Articles are read and
+written one at a time, so memory use does not depend on file size.
+"""
+
+import gzip
+import json
+
+from pyaltmetric import Article, CompactArticle, JSONParseException, decoder
+
+def open_ndjson(filename, mode = 'r'):
+    """Open an NDJSON file in text mode, using gzip for .gz names."""
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode + 't', encoding = 'utf-8')
+    return open(filename, mode, encoding = 'utf-8')
+
+def read_articles(source, errors = None, strict = False, fields = None):
+    """
+    Yield an Article for every line of an NDJSON file.
+
+    :param source: Filename or an open file object.
+    :param errors: A list. Lines that are not valid JSON or hold an empty
+        dictionary are appended to it as (line_number, line, exception)
+        and skipped. Without it bad lines are skipped silently.
+    :param strict: Raise JSONParseException on the first bad line instead.
+    :param fields: Names of the attributes to keep. CompactArticle objects
+        holding only those are yielded instead.
+    """
+    if isinstance(source, str):
+        with open_ndjson(source) as fi:
+            for article in read_articles(fi, errors, strict, fields):
+                yield article
+        return
+
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            raw = decoder.loads(line)
+            if fields is None:
+                yield Article(raw)
+            else:
+                yield CompactArticle(raw, fields)
+        except (ValueError, AttributeError) as e:
+            if strict:
+                raise JSONParseException("Line %d: %s" % (line_number, e))
+            if errors is not None:
+                errors.append((line_number, line, e))
+
+def write_articles(articles, destination):
+    """
+    Write articles, or raw Altmetric dictionaries, to an NDJSON file one
+    per line. None entries are skipped. Return the number written.
+
+    :param destination: Filename or an open text file object. An open file
+        is left open so a crawl can keep appending to it.
+    """
+    if isinstance(destination, str):
+        with open_ndjson(destination, 'w') as fo:
+            return write_articles(articles, fo)
+
+    count = 0
+    for article in articles:
+        if article is None:
+            continue
+        if isinstance(article, dict):
+            raw = article
+        else:
+            raw = article.raw_dictionary
+        destination.write(json.dumps(raw, separators = (',', ':')))
+        destination.write('\n')
+        count += 1
+    return count
@@ -0,0 +1,129 @@
+"""
+Bulk Article construction on a process pool.
+
+Decoding JSON and parsing articles is CPU bound, so large dumps are split
+into chunks that are parsed in worker processes. Results come back in
+input order. At most two chunks per worker are in flight, so memory use
+does not grow with the size of the input.
+
+parse_ndjson is the one expected to scale with the number of workers: the
+parent only reads lines, and decoding happens in the workers. Results
+still come back pickled, which costs more with keep_raw. parse_articles
+has to pickle every dictionary out to a worker, which costs about as much
+in the parent as building a CompactArticle does in the worker, so it
+gains little over building them in a loop.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+
+from pyaltmetric import (Article, ARTICLE_FIELDS, CompactArticle, decoder,
+    IncorrectInput)
+from pyaltmetric.ndjson import open_ndjson
+
+def _check_fields(fields):
+    for name in fields or ():
+        if name not in ARTICLE_FIELDS:
+            raise IncorrectInput("Unknown article field %s." % name)
+
+def _build(raw, compact, fields, keep_raw):
+    """Return the article for raw, or None if raw is not a JSON object."""
+    try:
+        article = Article(raw)
+    except AttributeError:
+        return None
+    if compact:
+        return CompactArticle(article, fields, keep_raw)
+    for name in fields or ARTICLE_FIELDS:
+        getattr(article, name)
+    return article
+
+def _parse_dicts(raws, options):
+    articles = []
+    for raw in raws:
+        article = _build(raw, *options)
+        if article is not None:
+            articles.append(article)
+    return articles, []
+
+def _parse_lines(lines, options):
+    articles = []
+    errors = []
+    for line_number, line in lines:
+        try:
+            article = _build(decoder.loads(line), *options)
+        except ValueError as e:
+            errors.append((line_number, line, str(e)))
+            continue
+        if article is None:
+            errors.append((line_number, line,
+                "Not a non-empty JSON object."))
+        else:
+            articles.append(article)
+    return articles, errors
+
+def _run(worker, items, chunk_size, workers, options, errors):
+    """options is the (compact, fields, keep_raw) triple passed to _build."""
+    workers = workers or os.cpu_count() or 1
+    items = iter(items)
+    chunks = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        for chunk in itertools.islice(chunks, workers * 2):
+            pending.append(executor.submit(worker, chunk, options))
+        while pending:
+            articles, chunk_errors = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(worker, chunk, options))
+            if errors is not None:
+                errors.extend(chunk_errors)
+            for article in articles:
+                yield article
+
+def parse_articles(raw_dicts, chunk_size = 1000, workers = None,
+    compact = True, fields = None, keep_raw = False):
+    """
+    Yield articles parsed from raw Altmetric dictionaries, in order.
+    Empty dictionaries are skipped.
+
+    :param chunk_size: Number of dictionaries sent to a worker at once.
+    :param workers: Number of processes. Defaults to the number of CPUs.
+    :param compact: Yield CompactArticle objects. Otherwise yield Article
+        objects with every attribute already parsed.
+    :param fields: Attribute names to keep or parse. Defaults to all.
+        Unknown names raise IncorrectInput.
+    :param keep_raw: Keep the raw dictionary in CompactArticle objects.
+        Without it they have no raw_dictionary, so they cannot be passed
+        to ndjson.write_articles, snapshot.write_snapshot,
+        ArticleIndex.add_many or ArticleBatch.from_articles.
+    """
+    _check_fields(fields)
+    return _run(_parse_dicts, raw_dicts, chunk_size, workers,
+        (compact, fields, keep_raw), None)
+
+def parse_ndjson(source, chunk_size = 1000, workers = None, compact = True,
+    fields = None, errors = None, keep_raw = False):
+    """
+    Yield articles parsed from an NDJSON file, in order. Lines are decoded
+    in the workers as well.
+
+    :param source: Filename (.gz is decompressed) or an open file object.
+    :param errors: A list collecting (line_number, line, message) for
+        lines that are not valid JSON or hold an empty dictionary.
+    Other arguments are as for parse_articles.
+    """
+    _check_fields(fields)
+    if isinstance(source, str):
+        with open_ndjson(source) as fi:
+            for article in parse_ndjson(fi, chunk_size, workers, compact,
+                fields, errors, keep_raw):
+                yield article
+        return
+
+    lines = ((number, line) for number, line in enumerate(source, 1)
+        if line.strip())
+    for article in _run(_parse_lines, lines, chunk_size, workers,
+        (compact, fields, keep_raw), errors):
+        yield article
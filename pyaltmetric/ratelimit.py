@@ -0,0 +1,105 @@
+"""
+Client side rate limiting and retry delays for the Altmetric clients.
+"""
+
+import random
+import threading
+import time
+
+#Status codes worth retrying: rate limited, or the API is briefly down.
+RETRY_STATUS_CODES = (420, 429, 502, 503, 504)
+
+#Quota headers sent by Altmetric and the length of their windows in seconds.
+QUOTA_HEADERS = (
+    ('X-HourlyRateLimit-Remaining', 3600),
+    ('X-DailyRateLimit-Remaining', 86400),
+)
+
+class RateLimiter(object):
+    """
+    Token bucket shared by every thread using a client. acquire() blocks
+    until a request may be sent.
+    """
+    def __init__(self, rate, burst = 1):
+        """
+        :param rate: Requests allowed per second.
+        :param burst: Requests that may be sent back to back after an
+            idle period.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_hour(cls, requests_per_hour, burst = 1):
+        """Return a limiter allowing requests_per_hour requests an hour."""
+        return cls(requests_per_hour / 3600.0, burst)
+
+    def acquire(self):
+        """Wait for and take one token."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst,
+                        self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens to every thread for a while."""
+        with self._lock:
+            self._paused_until = max(self._paused_until,
+                time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+def backoff_delay(attempt, backoff_factor, max_backoff):
+    """Exponential backoff with full jitter for the given retry attempt."""
+    return random.uniform(0, min(max_backoff, backoff_factor * 2 ** attempt))
+
+def retry_after(headers):
+    """
+    Return the number of seconds the API asked us to wait, if any. Only
+    the numeric form of Retry-After is understood.
+    """
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+def quota_exhausted(headers, now = None):
+    """
+    Return the number of seconds until a used up quota resets, or None
+    while X-HourlyRateLimit-Remaining and X-DailyRateLimit-Remaining are
+    above 0 or missing. Quotas are assumed to reset on whole UTC hours and
+    days, since Altmetric does not say when they do.
+    """
+    if now is None:
+        now = time.time()
+    delay = None
+    for name, period in QUOTA_HEADERS:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            remaining = int(value)
+        except ValueError:
+            continue
+        if remaining <= 0:
+            delay = max(delay or 0.0, period - now % period)
+    return delay
@@ -0,0 +1,217 @@
+"""
+Splitting a timeframe crawl across processes or hosts.
+
+plan_shards turns one articles_from_timeframe query into independent
+CrawlShards. They are split by doi_prefix, nlmid, subjects or cited_in
+values, or by page ranges. Each shard is plain data: it can be turned into
+JSON, shipped to another node and run there with its own API key and rate
+budget as a resumable TimeframeCrawler. merge_results combines the shards'
+NDJSON outputs, keeping one copy of every article.
+"""
+
+import json
+import os
+
+from pyaltmetric import Altmetric, IncorrectInput, decoder
+from pyaltmetric.crawl import TimeframeCrawler
+from pyaltmetric.ndjson import open_ndjson
+from pyaltmetric.ratelimit import RateLimiter
+
+#Query parameters a crawl can be split by, besides 'page'.
+SHARD_PARAMETERS = ('doi_prefix', 'nlmid', 'subjects', 'cited_in')
+#Parameters that take a list, so several values can share a shard.
+_LIST_PARAMETERS = ('nlmid', 'subjects')
+
+class CrawlShard(object):
+    """One independent part of a timeframe crawl."""
+    FIELDS = ('name', 'timeframe', 'num_results', 'doi_prefix', 'nlmid',
+        'subjects', 'cited_in', 'first_page', 'last_page', 'api_key',
+        'requests_per_hour')
+
+    def __init__(self, name, timeframe, num_results = 100, doi_prefix = None,
+        nlmid = None, subjects = None, cited_in = None, first_page = 1,
+        last_page = None, api_key = None, requests_per_hour = None):
+        self.name = name
+        self.timeframe = timeframe
+        self.num_results = num_results
+        self.doi_prefix = doi_prefix
+        self.nlmid = nlmid
+        self.subjects = subjects
+        self.cited_in = cited_in
+        self.first_page = first_page
+        self.last_page = last_page
+        self.api_key = api_key
+        self.requests_per_hour = requests_per_hour
+
+    def to_dict(self):
+        return dict((field, getattr(self, field)) for field in self.FIELDS)
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        return cls(**dictionary)
+
+    def __eq__(self, other):
+        return isinstance(other, CrawlShard) and \
+            self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return "<CrawlShard %s>" % self.name
+
+    def client(self, **kwargs):
+        """
+        Return an Altmetric client using this shard's API key and rate
+        budget. Keyword arguments are passed on to Altmetric.
+        """
+        if self.requests_per_hour and 'rate_limiter' not in kwargs:
+            kwargs['rate_limiter'] = RateLimiter.per_hour(
+                self.requests_per_hour)
+        return Altmetric(self.api_key, **kwargs)
+
+    def crawler(self, directory, client = None, **kwargs):
+        """
+        Return a TimeframeCrawler for this shard, checkpointing to
+        <directory>/<name>.json and writing <directory>/<name>.results.ndjson.
+        Keyword arguments are passed on to TimeframeCrawler.
+        """
+        if client is None:
+            client = self.client()
+        return TimeframeCrawler(client, self.timeframe,
+            os.path.join(directory, self.name + '.json'),
+            num_results = self.num_results, doi_prefix = self.doi_prefix,
+            nlmid = self.nlmid, subjects = self.subjects,
+            cited_in = self.cited_in, page = self.first_page,
+            last_page = self.last_page, **kwargs)
+
+    def run(self, directory, client = None, **kwargs):
+        """Crawl the shard to completion. Return the results filename."""
+        crawler = self.crawler(directory, client, **kwargs)
+        for article in crawler.run():
+            pass
+        return crawler.results
+
+def _split(values, shards):
+    """Split values into at most shards contiguous, near equal groups."""
+    shards = max(1, min(shards, len(values)))
+    size, extra = divmod(len(values), shards)
+    groups = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(values[start:end])
+        start = end
+    return groups
+
+def plan_shards(timeframe, by, values = None, shards = None, pages = None,
+    num_results = 100, api_keys = None, requests_per_hour = None, **query):
+    """
+    Split a timeframe query into a list of CrawlShards.
+
+    :param by: 'doi_prefix', 'nlmid', 'subjects', 'cited_in' or 'page'.
+    :param values: Values of the by parameter. doi_prefix and cited_in
+        shards take one value each. nlmid and subjects values are grouped
+        into shards lists.
+    :param shards: Number of shards for nlmid, subjects and page splits.
+    :param pages: For 'page', the number of pages the query is expected
+        to have. The last shard has no end, so nothing is missed if the
+        query grows while it is crawled.
+    :param api_keys: Keys handed out to the shards in turn.
+    :param requests_per_hour: Hourly request budget of each key, divided
+        evenly between the shards using it.
+    Other keyword arguments (doi_prefix, nlmid, subjects, cited_in) apply
+    to every shard.
+    """
+    for name in query:
+        if name not in SHARD_PARAMETERS:
+            raise IncorrectInput("Unknown query parameter %s." % name)
+
+    if by == 'page':
+        if not pages or pages < 1:
+            raise IncorrectInput("Splitting by page needs a page count.")
+        groups = _split(list(range(1, pages + 1)), shards or 1)
+        parts = [{'first_page': group[0], 'last_page': group[-1]}
+            for group in groups]
+        parts[-1]['last_page'] = None
+    elif by in SHARD_PARAMETERS:
+        if by in query:
+            raise IncorrectInput("%s is both the split and a filter." % by)
+        values = list(values or ())
+        if not values:
+            raise IncorrectInput("Splitting by %s needs values." % by)
+        if by in _LIST_PARAMETERS:
+            groups = _split(values, shards or len(values))
+        else:
+            groups = values
+        parts = [{by: group} for group in groups]
+    else:
+        raise IncorrectInput("Cannot split a crawl by %s." % by)
+
+    api_keys = list(api_keys or [None])
+    users = dict((key, 0) for key in api_keys)
+    for i in range(len(parts)):
+        users[api_keys[i % len(api_keys)]] += 1
+
+    plan = []
+    for i, part in enumerate(parts):
+        api_key = api_keys[i % len(api_keys)]
+        budget = None
+        if requests_per_hour:
+            budget = float(requests_per_hour) / users[api_key]
+        settings = dict(query, **part)
+        plan.append(CrawlShard("%s-%s-%03d" % (timeframe, by, i), timeframe,
+            num_results = num_results, api_key = api_key,
+            requests_per_hour = budget, **settings))
+    return plan
+
+def save_plan(shards, filename):
+    """Write a list of CrawlShards to a JSON file."""
+    with open(filename, 'w') as fo:
+        json.dump([shard.to_dict() for shard in shards], fo, indent = 1)
+
+def load_plan(filename):
+    """Read a list of CrawlShards written by save_plan."""
+    with open(filename) as fi:
+        return [CrawlShard.from_dict(d) for d in json.load(fi)]
+
+def _last_updated(raw):
+    value = raw.get('last_updated')
+    return value if isinstance(value, (int, float)) else -1
+
+def merge_results(sources, destination):
+    """
+    Combine shard NDJSON outputs into one file with one line per Altmetric
+    ID, keeping the most recently updated copy. Lines without an ID are
+    all kept. Return the number of lines written.
+
+    Only the IDs are held in memory: the sources are read twice.
+    """
+    sources = list(sources)
+    best = {}
+    for source_number, source in enumerate(sources):
+        with open_ndjson(source) as fi:
+            for line_number, line in enumerate(fi):
+                if not line.strip():
+                    continue
+                raw = decoder.loads(line)
+                altmetric_id = raw.get('altmetric_id')
+                if altmetric_id is None:
+                    continue
+                position = (_last_updated(raw), -source_number, -line_number)
+                altmetric_id = str(altmetric_id)
+                if altmetric_id not in best or best[altmetric_id] < position:
+                    best[altmetric_id] = position
+
+    keep = set((-source_number, -line_number) for last_updated,
+        source_number, line_number in best.values())
+    count = 0
+    with open_ndjson(destination, 'w') as fo:
+        for source_number, source in enumerate(sources):
+            with open_ndjson(source) as fi:
+                for line_number, line in enumerate(fi):
+                    if not line.strip():
+                        continue
+                    if (source_number, line_number) not in keep and \
+                        decoder.loads(line).get('altmetric_id') is not None:
+                        continue
+                    fo.write(line.rstrip('\n') + '\n')
+                    count += 1
+    return count
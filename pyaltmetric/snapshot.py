@@ -0,0 +1,238 @@
+"""
+Read-only, memory mapped article snapshots.
+
+A snapshot file holds many articles in a layout that can be used straight
+from a memory map, so every worker process opening the same file shares
+its pages through the OS cache and startup does no parsing at all.
+
+Layout, all integers little endian:
+
+    magic       8 bytes, b'PYAMSNP1'
+    header      version, count, blobs offset, offsets offset, numeric
+                offset (uint32 and four uint64), then the length and JSON
+                list of the numeric column names (uint32 and bytes)
+    blobs       each article's raw dictionary as compact UTF-8 JSON
+    offsets     count + 1 uint64 blob boundaries
+    numeric     one float64 column of count values per column name, NaN
+                for missing values
+
+Sections start on 8 byte boundaries. The numeric columns are the ones
+ArticleBatch uses: score, the cited_by_* counts, readers_count and the
+added_on, published_on and last_updated timestamps. On little endian
+machines offsets and columns are used in place; big endian machines read
+byte swapped copies of them.
+"""
+
+import array
+import datetime
+import json
+import math
+import mmap
+import struct
+import sys
+
+from pyaltmetric import Article, IncorrectInput, decoder
+from pyaltmetric.batch import NUMERIC_COLUMNS
+
+MAGIC = b'PYAMSNP1'
+VERSION = 1
+_HEADER = struct.Struct('<IQQQQI')
+_TIMESTAMP_COLUMNS = ('added_on', 'published_on', 'last_updated')
+_FLOAT_COLUMNS = ('score',)
+#array and memoryview use the machine's byte order; the file is little
+#endian.
+_SWAP = sys.byteorder != 'little'
+
+def _pad(fo):
+    position = fo.tell()
+    if position % 8:
+        fo.write(b'\0' * (8 - position % 8))
+    return fo.tell()
+
+def _write_little_endian(fo, values):
+    if _SWAP:
+        values.byteswap()
+    values.tofile(fo)
+
+def write_snapshot(filename, articles):
+    """
+    Write Articles or raw dictionaries to a snapshot file. None entries are
+    skipped. Return the number of articles written.
+    """
+    names = [name for name, keys in NUMERIC_COLUMNS]
+    names_json = json.dumps(names).encode('utf-8')
+    columns = [array.array('d') for name in names]
+    offsets = array.array('Q', [0])
+
+    with open(filename, 'wb') as fo:
+        fo.write(MAGIC)
+        fo.write(b'\0' * _HEADER.size)
+        fo.write(struct.pack('<I', len(names_json)))
+        fo.write(names_json)
+        blobs_offset = _pad(fo)
+
+        for article in articles:
+            if article is None:
+                continue
+            raw = article if isinstance(article, dict) \
+                else article.raw_dictionary
+            if not raw:
+                continue
+            blob = json.dumps(raw, separators = (',', ':')).encode('utf-8')
+            fo.write(blob)
+            offsets.append(offsets[-1] + len(blob))
+            for column, (name, keys) in zip(columns, NUMERIC_COLUMNS):
+                for key in keys:
+                    value = raw.get(key)
+                    if value:
+                        break
+                column.append(float('nan') if value is None else value)
+
+        offsets_offset = _pad(fo)
+        _write_little_endian(fo, offsets)
+        numeric_offset = _pad(fo)
+        for column in columns:
+            _write_little_endian(fo, column)
+
+        count = len(offsets) - 1
+        fo.seek(len(MAGIC))
+        fo.write(_HEADER.pack(VERSION, count, blobs_offset, offsets_offset,
+            numeric_offset, 0))
+    return count
+
+class Snapshot(object):
+    """
+    A snapshot file opened through mmap. Indexing or iterating yields
+    SnapshotArticle views; nothing is decoded until it is read.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0,
+            access = mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise IncorrectInput("%s is not an article snapshot." % filename)
+
+        (version, self._count, self._blobs_offset, offsets_offset,
+            numeric_offset, unused) = _HEADER.unpack_from(self._map,
+            len(MAGIC))
+        if version != VERSION:
+            self.close()
+            raise IncorrectInput("Unsupported snapshot version %d." % version)
+        names_at = len(MAGIC) + _HEADER.size
+        names_length, = struct.unpack_from('<I', self._map, names_at)
+        self._names = json.loads(
+            self._map[names_at + 4:names_at + 4 + names_length])
+
+        self._view = memoryview(self._map)
+        self._offsets = self._section(offsets_offset, self._count + 1, 'Q')
+        self._columns = {}
+        for position, name in enumerate(self._names):
+            self._columns[name] = self._section(
+                numeric_offset + 8 * self._count * position, self._count, 'd')
+
+    def _section(self, start, length, typecode):
+        """View length little endian 8 byte values as typecode."""
+        view = self._view[start:start + 8 * length]
+        if not _SWAP:
+            return view.cast(typecode)
+        values = array.array(typecode)
+        values.frombytes(view)
+        view.release()
+        values.byteswap()
+        return memoryview(values)
+
+    def close(self):
+        """
+        Unmap the file. Column views handed out by column() must be
+        released first.
+        """
+        for column in getattr(self, '_columns', {}).values():
+            column.release()
+        if getattr(self, '_offsets', None) is not None:
+            self._offsets.release()
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._count
+        if not 0 <= row < self._count:
+            raise IndexError("snapshot row out of range")
+        return SnapshotArticle(self, row)
+
+    def __iter__(self):
+        for row in range(self._count):
+            yield SnapshotArticle(self, row)
+
+    @property
+    def column_names(self):
+        return list(self._names)
+
+    def column(self, name):
+        """Return a zero-copy float64 memoryview of a numeric column."""
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise IncorrectInput("Unknown column %s." % name)
+
+    def raw(self, row):
+        """Decode and return the raw dictionary of one row."""
+        start = self._blobs_offset + self._offsets[row]
+        end = self._blobs_offset + self._offsets[row + 1]
+        #Not a memoryview: the json module only decodes str and bytes.
+        return decoder.loads(self._map[start:end])
+
+class SnapshotArticle(object):
+    """
+    A lazy view of one snapshot row. Numeric attributes are read straight
+    from the map; any other attribute decodes the row's JSON once and is
+    answered by an Article.
+    """
+    __slots__ = ('_snapshot', '_row', '_article')
+
+    def __init__(self, snapshot, row):
+        self._snapshot = snapshot
+        self._row = row
+        self._article = None
+
+    def _numeric(self, name):
+        value = self._snapshot._columns[name][self._row]
+        if math.isnan(value):
+            return None
+        if name in _TIMESTAMP_COLUMNS:
+            return datetime.datetime.fromtimestamp(int(value))
+        if name in _FLOAT_COLUMNS:
+            return value
+        return int(value)
+
+    @property
+    def article(self):
+        """Return the full Article for this row."""
+        if self._article is None:
+            self._article = Article(self._snapshot.raw(self._row))
+        return self._article
+
+    @property
+    def raw_dictionary(self):
+        return self.article.raw_dictionary
+
+    def __getattr__(self, name):
+        if name in self._snapshot._columns:
+            return self._numeric(name)
+        return getattr(self.article, name)
+
+    def __repr__(self):
+        return "<SnapshotArticle row %d>" % self._row
@@ -10,4 +10,8 @@ setup(
     description='A python wrapper for the Altmetric API.',
     long_description=open('README.txt').read(),
     install_requires=['requests>=2.20.0'],
+    extras_require={
+        'async': ['aiohttp>=3.0'],
+        'fast': ['orjson'],
+    },
 )
@@ -0,0 +1,107 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.aggregate import (QuantileSketch, RunningStats, TopK,
+    aggregate, threshold)
+from tests.test_altmetric import PagedSession
+import random
+
+
+def raw_articles(count):
+    return [{"doi": "10.1/%d" % i, "score": float(i % 50),
+        "cited_by_tweeters_count": i % 7,
+        "journal": "Journal %d" % (i % 3),
+        "subjects": ["s%d" % (i % 2), "all"]} for i in range(count)]
+
+
+class TestTopK(TestCase):
+    def setUp(self):
+        self.raws = raw_articles(200)
+        random.Random(1).shuffle(self.raws)
+
+    def test_matches_sorting(self):
+        top = TopK(10, 'score').update(self.raws)
+        expected = sorted(self.raws, key = lambda r: -r['score'])[:10]
+        self.assertEqual([r['score'] for r in expected],
+            [a.score for a in top.results()])
+        self.assertEqual(200, top.seen)
+
+    def test_grouped(self):
+        top = TopK(3, 'cited_by_tweeters_count', group_by = 'journal')
+        top.update(Article(r) for r in self.raws)
+        results = top.results()
+        self.assertEqual(["Journal 0", "Journal 1", "Journal 2"],
+            sorted(results))
+        for journal, articles in results.items():
+            self.assertEqual([6, 6, 6],
+                [a.cited_by_tweeters_count for a in articles])
+            self.assertTrue(all(a.journal == journal for a in articles))
+
+    def test_list_groups(self):
+        top = TopK(1, 'score', group_by = 'subjects').update(self.raws)
+        results = top.results()
+        self.assertEqual(["all", "s0", "s1"], sorted(results))
+        self.assertEqual(49.0, results["all"][0].score)
+        self.assertEqual(48.0, results["s0"][0].score)
+
+    def test_minimum_and_missing(self):
+        raws = self.raws + [{"doi": "10.1/none"}]
+        top = TopK(1000, 'score', minimum = 45).update(raws)
+        self.assertEqual(20, len(top.results()))
+        self.assertEqual(20, top.seen)
+
+    def test_bad_arguments(self):
+        self.assertRaises(IncorrectInput, TopK, 0)
+        self.assertRaises(IncorrectInput, TopK, 5, 'colour')
+
+
+class TestRunningStats(TestCase):
+    def test_stats(self):
+        raws = raw_articles(1000) + [{"doi": "10.1/none"}]
+        stats = RunningStats('score').update(raws)
+        self.assertEqual(1000, stats.count)
+        self.assertEqual(1, stats.missing)
+        self.assertEqual(24500.0, stats.total)
+        self.assertEqual(24.5, stats.mean)
+        self.assertEqual((0.0, 49.0), (stats.minimum, stats.maximum))
+        self.assertAlmostEqual(24.0, stats.percentile(50), delta = 0.25)
+        self.assertEqual(0.0, stats.percentile(0))
+        self.assertAlmostEqual(49.0, stats.percentile(100), delta = 0.5)
+        self.assertEqual(1000, stats.snapshot()['count'])
+
+    def test_merge(self):
+        raws = raw_articles(600)
+        whole = RunningStats().update(raws)
+        first = RunningStats().update(raws[:250])
+        first.merge(RunningStats().update(raws[250:]))
+        self.assertEqual(whole.snapshot(), first.snapshot())
+
+    def test_sketch_accuracy(self):
+        generator = random.Random(2)
+        values = [generator.lognormvariate(2, 2) for i in range(5000)]
+        sketch = QuantileSketch(0.01)
+        for value in values:
+            sketch.add(value)
+        values.sort()
+        for q in (0.1, 0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(exact, sketch.quantile(q),
+                delta = 0.011 * exact)
+        self.assertEqual(None, QuantileSketch().quantile(0.5))
+
+
+class TestStreaming(TestCase):
+    def test_threshold_and_aggregate(self):
+        raws = raw_articles(100)
+        top = TopK(2)
+        stats = RunningStats()
+        self.assertEqual(10, aggregate(threshold(raws, 'score', 45), top,
+            stats))
+        self.assertEqual([49.0, 49.0], [a.score for a in top.results()])
+        self.assertEqual(45.0, stats.minimum)
+
+    def test_live_feed(self):
+        api = Altmetric(session = PagedSession(3))
+        stats = RunningStats('score')
+        self.assertEqual(9, aggregate(api.articles_from_timeframe('1d'),
+            stats))
+        self.assertEqual(9, stats.missing)
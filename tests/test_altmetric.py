@@ -0,0 +1,297 @@
+from unittest import TestCase, mock
+from pyaltmetric import *
+import asyncio
+import datetime
+import json
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, payload = None, headers = None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+        self.elapsed = datetime.timedelta(0)
+        self.closed = False
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode('utf-8')
+
+    def iter_content(self, chunk_size = 1):
+        content = self.content
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession(object):
+    """Stand-in for requests.Session that answers from a dictionary."""
+    def __init__(self, responses = None):
+        self.responses = responses or {}
+        self.calls = []
+        self.closed = False
+
+    def get(self, url, params = None, headers = None, timeout = None,
+        stream = False):
+        self.calls.append((url, dict(params or {})))
+        return self.responses.get(url, FakeResponse(404))
+
+    def close(self):
+        self.closed = True
+
+
+class TestAltmetricSession(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        url = "http://api.altmetric.com/v1/doi/10.1038/news.2011.490"
+        self.session = FakeSession({url: FakeResponse(200, self.raw_dict)})
+
+    def test_injected_session_is_used(self):
+        api = Altmetric(session = self.session)
+        a = api.article_from_doi("10.1038/news.2011.490")
+        self.assertIsInstance(a, Article)
+        self.assertEqual(1, len(self.session.calls))
+
+    def test_missing_article(self):
+        api = Altmetric(session = self.session)
+        self.assertEqual(None, api.article_from_pmid("1"))
+
+    def test_field_projection(self):
+        api = Altmetric(session = self.session)
+        a = api.article_from_doi("10.1038/news.2011.490",
+            fields = ('doi', 'score'))
+        self.assertIsInstance(a, CompactArticle)
+        self.assertEqual("10.1038/news.2011.490", a.doi)
+        self.assertRaises(AttributeError, getattr, a, 'title')
+        self.assertRaises(AttributeError, getattr, a, 'raw_dictionary')
+        self.assertRaises(IncorrectInput, api.article_from_doi,
+            "10.1038/news.2011.490", fields = ('colour',))
+
+    def test_close_leaves_injected_session_open(self):
+        with Altmetric(session = self.session) as api:
+            api.article_from_doi("10.1038/news.2011.490")
+        self.assertFalse(self.session.closed)
+
+    def test_owned_session_pool_settings(self):
+        api = Altmetric(pool_connections = 2, pool_maxsize = 7)
+        adapter = api.session.get_adapter("http://api.altmetric.com/")
+        self.assertEqual(7, adapter._pool_maxsize)
+        self.assertEqual(2, adapter._pool_connections)
+        api.close()
+
+
+class TestAltmetricBatch(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        self.dois = ["10.1000/%d" % i for i in range(20)]
+        responses = {}
+        for doi in self.dois[::2]:
+            url = "http://api.altmetric.com/v1/doi/" + doi
+            responses[url] = FakeResponse(200, self.raw_dict)
+        self.session = FakeSession(responses)
+        self.api = Altmetric(session = self.session)
+
+    def test_articles_from_dois_ordered(self):
+        results = list(self.api.articles_from_dois(iter(self.dois),
+            max_workers = 4, ordered = True))
+        self.assertEqual(self.dois, [doi for doi, a in results])
+        for position, (doi, article) in enumerate(results):
+            if position % 2:
+                self.assertEqual(None, article)
+            else:
+                self.assertIsInstance(article, Article)
+
+    def test_articles_from_dois_unordered(self):
+        results = dict(self.api.articles_from_dois(self.dois, max_workers = 3))
+        self.assertEqual(set(self.dois), set(results))
+        self.assertEqual(20, len(self.session.calls))
+
+    def test_articles_from_pmids_uses_pmid_method(self):
+        list(self.api.articles_from_pmids(["1", "2"]))
+        for url, params in self.session.calls:
+            self.assertIn("/pmid/", url)
+
+    def test_errors_propagate(self):
+        self.session.responses["http://api.altmetric.com/v1/doi/bad"] = \
+            FakeResponse(403)
+        results = self.api.articles_from_dois(["bad"])
+        self.assertRaises(AltmetricHTTPException, list, results)
+
+    def test_bad_max_workers(self):
+        self.assertRaises(IncorrectInput, self.api.articles_from_dois,
+            self.dois, max_workers = 0)
+
+
+class FakeAsyncResponse(object):
+    def __init__(self, status, payload = None):
+        self.status = status
+        self._payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def read(self):
+        return json.dumps(self._payload).encode('utf-8')
+
+
+class FakeAsyncSession(object):
+    """Stand-in for aiohttp.ClientSession that answers from a dictionary."""
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def get(self, url, params = None):
+        self.calls.append((url, list(params or [])))
+        return self.responses.get(url, FakeAsyncResponse(404))
+
+
+class TestAsyncAltmetric(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        base = "http://api.altmetric.com/v1/"
+        self.session = FakeAsyncSession({
+            base + "doi/10.1038/news.2011.490":
+                FakeAsyncResponse(200, self.raw_dict),
+            base + "citations/1w": FakeAsyncResponse(200,
+                {"results": [self.raw_dict, self.raw_dict]}),
+            base + "arxiv/down": FakeAsyncResponse(502),
+        })
+        self.api = AsyncAltmetric("key", session = self.session)
+
+    def test_article_from_doi(self):
+        article = asyncio.run(
+            self.api.article_from_doi("10.1038/news.2011.490"))
+        self.assertIsInstance(article, Article)
+        self.assertIn(("key", "key"), self.session.calls[0][1])
+
+    def test_article_missing(self):
+        self.assertEqual(None, asyncio.run(self.api.article_from_pmid("1")))
+
+    def test_http_error(self):
+        self.assertRaises(AltmetricHTTPException, asyncio.run,
+            self.api.article_from_arxiv("down"))
+
+    def test_articles_from_timeframe(self):
+        async def collect():
+            # Every page answers the same, so stop after the first two.
+            articles = []
+            async for article in self.api.articles_from_timeframe('1 week',
+                nlmid = ["1", "2"]):
+                articles.append(article)
+                if len(articles) == 4:
+                    break
+            return articles
+
+        articles = asyncio.run(collect())
+        self.assertEqual(4, len(articles))
+        url, params = self.session.calls[0]
+        self.assertIn(("nlmid", "1"), params)
+        self.assertIn(("nlmid", "2"), params)
+        self.assertNotIn("doi_prefix", [k for k, v in params])
+
+    def test_bad_timeframe(self):
+        async def collect():
+            return [a async for a in self.api.articles_from_timeframe('2y')]
+        self.assertRaises(IncorrectInput, asyncio.run, collect())
+
+
+class PagedSession(FakeSession):
+    """Serves num_pages pages of citations, then 404s."""
+    def __init__(self, num_pages, per_page = 3):
+        super(PagedSession, self).__init__()
+        self.num_pages = num_pages
+        self.per_page = per_page
+
+    def get(self, url, params = None, headers = None, timeout = None,
+        stream = False):
+        self.calls.append((url, dict(params or {})))
+        page = params['page']
+        if page > self.num_pages:
+            return FakeResponse(404)
+        results = [{"doi": "10.1/%d.%d" % (page, i)}
+            for i in range(self.per_page)]
+        return FakeResponse(200, {"results": results})
+
+
+class TestTimeframe(TestCase):
+    def test_serial(self):
+        api = Altmetric(session = PagedSession(4))
+        articles = list(api.articles_from_timeframe('1d'))
+        self.assertEqual(12, len(articles))
+        self.assertEqual("10.1/1.0", articles[0].doi)
+
+    def test_field_projection(self):
+        api = Altmetric(session = PagedSession(2))
+        articles = list(api.articles_from_timeframe('1d', fields = ('doi',)))
+        self.assertEqual(["10.1/1.0", "10.1/1.1", "10.1/1.2", "10.1/2.0",
+            "10.1/2.1", "10.1/2.2"], [a.doi for a in articles])
+        self.assertRaises(AttributeError, getattr, articles[0], 'score')
+
+    def test_prefetch_matches_serial(self):
+        serial = [a.doi for a in Altmetric(session = PagedSession(7))
+            .articles_from_timeframe('1d', page = 2)]
+        prefetched = [a.doi for a in Altmetric(session = PagedSession(7))
+            .articles_from_timeframe('1d', page = 2, prefetch = 3)]
+        self.assertEqual(serial, prefetched)
+        self.assertEqual("10.1/2.0", prefetched[0])
+
+    def test_stream_matches_serial(self):
+        serial = [a.raw_dictionary for a in Altmetric(
+            session = PagedSession(4)).articles_from_timeframe('1d')]
+        session = PagedSession(4)
+        streamed = [a.raw_dictionary for a in Altmetric(session = session)
+            .articles_from_timeframe('1d', stream = True)]
+        self.assertEqual(serial, streamed)
+        self.assertEqual(5, len(session.calls))
+
+    def test_stream_errors(self):
+        session = FakeSession({"http://api.altmetric.com/v1/citations/1d":
+            FakeResponse(403)})
+        api = Altmetric(session = session)
+        self.assertRaises(AltmetricHTTPException, list,
+            api.articles_from_timeframe('1d', stream = True))
+        self.assertRaises(IncorrectInput, list,
+            api.articles_from_timeframe('1d', stream = True, prefetch = 2))
+
+    @mock.patch('pyaltmetric.time.sleep')
+    def test_stream_closes_retried_responses(self, sleep):
+        busy = FakeResponse(503)
+        session = PagedSession(1)
+        get = session.get
+        answers = [busy]
+        session.get = lambda *args, **kwargs: (answers.pop() if answers
+            else get(*args, **kwargs))
+        api = Altmetric(session = session)
+        self.assertEqual(3, len(list(api.articles_from_timeframe('1d',
+            stream = True))))
+        self.assertTrue(busy.closed)
+
+    def test_stream_reads_error_bodies(self):
+        class StreamedResponse(FakeResponse):
+            @property
+            def content(self):
+                #Like requests, nothing is left to read once closed.
+                return b'' if self.closed else b'{"error": "gone"}'
+        url = "http://api.altmetric.com/v1/citations/1d"
+        session = FakeSession({url: StreamedResponse(404)})
+        metrics = MetricsAggregator()
+        api = Altmetric(session = session, observers = [metrics])
+        self.assertEqual([], list(api.articles_from_timeframe('1d',
+            stream = True)))
+        self.assertEqual(17, metrics.snapshot()['bytes'])
+
+    def test_prefetch_is_bounded(self):
+        session = PagedSession(100)
+        articles = Altmetric(session = session).articles_from_timeframe(
+            '1d', prefetch = 2)
+        next(articles)
+        articles.close()
+        self.assertTrue(len(session.calls) <= 3)
@@ -2,6 +2,7 @@ from unittest import TestCase
 from pyaltmetric import *
 import json
 import datetime
+import io
 
 class TestArticle(TestCase):
     def setUp(self):
@@ -225,10 +226,22 @@ class TestArticle(TestCase):
         a = Article.from_json_file('tests/fixtures/full.json')
         self.assertIsInstance(a, Article)
 
+    def test_from_json_file_fields(self):
+        a = Article.from_json_file('tests/fixtures/full.json',
+            fields = ('title', 'score'))
+        self.assertIsInstance(a, CompactArticle)
+        self.assertEqual(self.art.title, a.title)
+        self.assertRaises(AttributeError, getattr, a, 'doi')
+
     def test_from_file_empty(self):
         with open('tests/fixtures/empty.json') as raw_json:
             self.assertRaises(AttributeError, Article.from_json,raw_json)
 
+    def test_from_file_not_an_object(self):
+        self.assertRaises(AttributeError, Article.from_json,
+            io.StringIO('[1, 2]'))
+        self.assertRaises(AttributeError, Article, "10.1/x")
+
     def test_from_file_wrong(self):
         with open('tests/fixtures/wrong.txt') as raw_json:
             self.assertRaises(JSONParseException, Article.from_json, raw_json)
@@ -291,5 +304,81 @@ class TestArticle(TestCase):
         for key in correct_context:
             self.assertEquals(correct_context[key], new_context.get(key))
 
+    def test_score_for(self):
+        history = self.art.raw_dictionary['history']
+        self.assertEqual(history['at'], self.art.score_for('at'))
+        self.assertEqual(history['3d'], self.art.score_for('past 3 days'))
+        self.assertEqual(self.art.score_history['past week'],
+            self.art.score_for('1w'))
+        self.assertRaises(IncorrectInput, self.art.score_for, 'past decade')
+
+    def test_context_accessors(self):
+        context = self.art.raw_dictionary['context']
+        self.assertEqual(context['all']['pct'], self.art.context_percentile())
+        self.assertEqual(context['similar_age_journal_3m']['rank'],
+            self.art.context_rank('journal age'))
+        self.assertEqual(context['journal']['count'],
+            self.art.context_value('journal', 'count'))
+        self.assertEqual(self.art.score_context['context age']['pct'],
+            self.art.context_percentile('similar_age_3m'))
+        self.assertRaises(IncorrectInput, self.art.context_percentile,
+            'galaxy')
+
+    def test__parse_score_context_missing(self):
+        new_context = self.art._parse_score_context({'all': {'pct': 5}})
+        self.assertEqual({'pct': 5}, new_context['all'])
+        self.assertFalse(new_context['journal'])
+        self.assertEqual({}, new_context['context age'])
+        self.assertIsInstance(new_context['journal'], dict)
+
     def test__parse_score_context_empty(self):
-        self.assertEquals(self.art._parse_score_context({}),{})
\ No newline at end of file
+        self.assertEquals(self.art._parse_score_context({}),{})
+
+    def test_lazy_parsing(self):
+        a = Article(self.art.raw_dictionary)
+        self.assertEqual({}, a._fields)
+        self.assertEqual("10.1038/news.2011.490", a.doi)
+        self.assertEqual(["doi"], list(a._fields))
+        self.assertIs(a.score_history, a.score_history)
+
+    def test__parse_raw_resets_fields(self):
+        self.assertTrue(self.art.title)
+        self.art._raw = {"title": "Other"}
+        self.art._parse_raw()
+        self.assertEqual("Other", self.art.title)
+
+
+class TestCompactArticle(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        self.art = Article(self.raw_dict)
+
+    def test_matches_article(self):
+        compact = CompactArticle(self.raw_dict)
+        for name in ARTICLE_FIELDS:
+            self.assertEqual(getattr(self.art, name), getattr(compact, name))
+        self.assertFalse(hasattr(compact, '__dict__'))
+
+    def test_field_subset(self):
+        compact = CompactArticle(self.art, fields = ('doi', 'score'))
+        self.assertEqual(self.art.score, compact.score)
+        self.assertRaises(AttributeError, getattr, compact, 'title')
+        self.assertRaises(AttributeError, getattr, compact, 'raw_dictionary')
+
+    def test_keep_raw(self):
+        compact = CompactArticle(self.raw_dict, keep_raw = True)
+        self.assertIs(self.raw_dict, compact.raw_dictionary)
+
+    def test_interned_strings(self):
+        first = CompactArticle(json.loads(json.dumps(self.raw_dict)))
+        second = CompactArticle(json.loads(json.dumps(self.raw_dict)))
+        self.assertIs(first.journal, second.journal)
+        self.assertIs(first.issns[0], second.issns[0])
+
+    def test_unknown_field(self):
+        self.assertRaises(IncorrectInput, CompactArticle, self.raw_dict,
+            fields = ('colour',))
+
+    def test_empty(self):
+        self.assertRaises(AttributeError, CompactArticle, {})
@@ -0,0 +1,91 @@
+from unittest import TestCase, mock, skipIf
+from pyaltmetric import *
+from pyaltmetric import batch as batch_module
+from pyaltmetric.batch import ArticleBatch
+import json
+import math
+import random
+
+
+class TestArticleBatch(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            full = json.load(raw_json)
+        with open('tests/fixtures/average.json') as raw_json:
+            average = json.load(raw_json)
+        self.raws = []
+        for i, score in enumerate([5.0, 50.0, 1.0, 20.0]):
+            raw = dict(full if i % 2 else average)
+            raw['score'] = score
+            raw['doi'] = "10.1/%d" % i
+            raw['journal'] = "A" if i < 2 else "B"
+            self.raws.append(raw)
+        self.batch = ArticleBatch.from_raw(self.raws)
+
+    def test_columns_match_articles(self):
+        batch = ArticleBatch.from_articles(Article(r) for r in self.raws)
+        for row, raw in enumerate(self.raws):
+            article = Article(raw)
+            self.assertEqual(article.score, batch.column('score')[row])
+            self.assertEqual(article.cited_by_tweeters_count,
+                batch.column('cited_by_tweeters_count')[row])
+            self.assertEqual(article.cited_by_accounts_count,
+                batch.column('cited_by_accounts_count')[row])
+            self.assertEqual(article.score_history['all time'],
+                batch.column('history_at')[row])
+            self.assertEqual(article.subjects, batch.subjects(row))
+        self.assertEqual(["A", "A", "B", "B"], batch.journals)
+
+    def test_missing_values_are_nan(self):
+        batch = ArticleBatch.from_raw([{"doi": "10.1/x"}])
+        self.assertTrue(math.isnan(batch.column('score')[0]))
+
+    def test_filter(self):
+        batch = self.batch.filter('score', lambda score: score > 4)
+        self.assertEqual(["10.1/0", "10.1/1", "10.1/3"], batch.dois)
+
+    def test_sort_and_top_k(self):
+        self.assertEqual(["10.1/2", "10.1/0", "10.1/3", "10.1/1"],
+            self.batch.sort('score').dois)
+        self.assertEqual(["10.1/1", "10.1/3"],
+            self.batch.top_k('score', 2).dois)
+
+    def test_group_by_journal(self):
+        groups = self.batch.group_by_journal()
+        self.assertEqual(55.0, groups["A"].sum('score'))
+        self.assertEqual(["10.1/2", "10.1/3"], groups["B"].dois)
+        self.assertEqual(self.batch.subjects(3), groups["B"].subjects(1))
+
+    def test_ties_and_missing_values(self):
+        batch = ArticleBatch.from_raw([{"doi": str(i), "score": score}
+            for i, score in enumerate([3, None, 7, 3, 7, 3])])
+        self.assertEqual(["2", "4", "0"], batch.top_k('score', 3).dois)
+        self.assertEqual(["2", "4", "0", "3", "5", "1"],
+            batch.sort('score', reverse = True).dois)
+        self.assertEqual(["0", "3", "5", "2", "4", "1"],
+            batch.sort('score').dois)
+        self.assertEqual(["2", "4"],
+            batch.filter('score', lambda score: int(score) % 2 == 1
+                and score > 5).dois)
+        self.assertEqual(23.0, batch.sum('score'))
+        self.assertEqual([], batch.top_k('score', 0).dois)
+
+    @skipIf(batch_module.numpy is None, "numpy is not installed")
+    def test_numpy_matches_fallback(self):
+        generator = random.Random(3)
+        raws = [{"doi": str(i), "score": generator.choice(
+            [None, float(generator.randint(0, 20))])} for i in range(500)]
+        batch = ArticleBatch.from_raw(raws)
+
+        def run():
+            return (batch.filter('score', lambda score: score >= 10).dois,
+                batch.sort('score').dois,
+                batch.sort('score', reverse = True).dois,
+                batch.top_k('score', 37).dois,
+                batch.sum('score'))
+        vectorized = run()
+        with mock.patch.object(batch_module, 'numpy', None):
+            self.assertEqual(run(), vectorized)
+
+    def test_unknown_column(self):
+        self.assertRaises(IncorrectInput, self.batch.column, 'colour')
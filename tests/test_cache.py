@@ -0,0 +1,98 @@
+from unittest import TestCase
+from pyaltmetric import *
+from tests.test_altmetric import FakeResponse, FakeSession
+import json
+import os
+import shutil
+import tempfile
+import time
+
+
+class TestMemoryCache(TestCase):
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_size = 2)
+        cache.store("a", {"n": 1})
+        cache.store("b", {"n": 2})
+        cache.get("a")
+        cache.store("c", {"n": 3})
+        self.assertEqual({"n": 1}, cache.get("a"))
+        self.assertEqual(None, cache.get("b"))
+        self.assertEqual(2, len(cache))
+
+    def test_ttl_expiry(self):
+        cache = MemoryCache(ttl = 0.01)
+        cache.store("a", {"n": 1})
+        time.sleep(0.02)
+        self.assertEqual(None, cache.get("a"))
+
+    def test_negative_ttl(self):
+        cache = MemoryCache(negative_ttl = 0)
+        cache.store("missing", {})
+        self.assertEqual(None, cache.get("missing"))
+        cache = MemoryCache(negative_ttl = 60)
+        cache.store("missing", {})
+        self.assertEqual({}, cache.get("missing"))
+
+    def test_counters(self):
+        cache = MemoryCache()
+        cache.lookup("a")
+        cache.store("a", {"n": 1})
+        cache.lookup("a")
+        self.assertEqual({'hits': 1, 'misses': 1}, cache.stats)
+
+    def test_key_ignores_api_key(self):
+        self.assertEqual(cache_key('doi', ('x',), {'key': '1', 'page': 2}),
+            cache_key('doi', ('x',), {'page': 2}))
+
+
+class TestSQLiteCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_survives_reopen(self):
+        cache = SQLiteCache(self.path)
+        cache.store("a", {"n": 1})
+        cache.close()
+        cache = SQLiteCache(self.path)
+        self.assertEqual({"n": 1}, cache.get("a"))
+        cache.clear()
+        self.assertEqual(None, cache.get("a"))
+        cache.close()
+
+    def test_validators_stored_separately(self):
+        cache = SQLiteCache(self.path)
+        cache.store("a", {"n": 1}, {'ETag': '"x"'})
+        cache.store("b", {})
+        cache.close()
+        cache = SQLiteCache(self.path)
+        self.assertEqual({"n": 1}, cache.lookup("a"))
+        self.assertEqual({'ETag': '"x"'}, cache.lookup_validators("a"))
+        self.assertEqual(None, cache.lookup_validators("b"))
+        self.assertEqual({'hits': 1, 'misses': 0}, cache.stats)
+        cache.close()
+
+
+class TestAltmetricCache(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            raw_dict = json.load(raw_json)
+        url = "http://api.altmetric.com/v1/doi/10.1038/news.2011.490"
+        self.session = FakeSession({url: FakeResponse(200, raw_dict)})
+        self.cache = MemoryCache()
+        self.api = Altmetric(session = self.session, cache = self.cache)
+
+    def test_repeated_lookup_hits_cache(self):
+        first = self.api.article_from_doi("10.1038/news.2011.490")
+        second = self.api.article_from_doi("10.1038/news.2011.490")
+        self.assertEqual(first.doi, second.doi)
+        self.assertEqual(1, len(self.session.calls))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_not_found_is_cached(self):
+        self.assertEqual(None, self.api.article_from_pmid("1"))
+        self.assertEqual(None, self.api.article_from_pmid("1"))
+        self.assertEqual(1, len(self.session.calls))
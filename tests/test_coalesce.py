@@ -0,0 +1,73 @@
+from unittest import TestCase
+from pyaltmetric import *
+from tests.test_altmetric import FakeResponse
+import concurrent.futures
+import json
+import threading
+import time
+
+
+class SlowSession(object):
+    """Answers every request after a delay, counting the requests."""
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params = None, headers = None, timeout = None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.1)
+        return self.response
+
+
+class TestSingleFlight(TestCase):
+    def test_exception_is_shared(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            first = executor.submit(flight.do, "k", fail)
+            started.wait()
+            second = executor.submit(flight.do, "k", lambda: 1)
+            self.assertRaises(ValueError, first.result)
+            self.assertRaises(ValueError, second.result)
+        self.assertEqual(1, flight.shared)
+        self.assertEqual(0, len(flight))
+
+    def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+        self.assertEqual(1, flight.do("k", lambda: 1))
+        self.assertEqual(2, flight.do("k", lambda: 2))
+
+
+class TestAltmetricCoalescing(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        self.session = SlowSession(FakeResponse(200, self.raw_dict))
+
+    def test_concurrent_lookups_share_a_request(self):
+        api = Altmetric(session = self.session)
+        with concurrent.futures.ThreadPoolExecutor(10) as executor:
+            articles = list(executor.map(lambda i: api.article_from_doi(
+                "10.1038/news.2011.490"), range(10)))
+        self.assertEqual(1, self.session.calls)
+        self.assertEqual(10, len([a for a in articles if a is not None]))
+
+    def test_batch_duplicates_share_a_request(self):
+        api = Altmetric(session = self.session)
+        results = list(api.articles_from_dois(["10.1/a"] * 5 + ["10.1/b"],
+            max_workers = 6))
+        self.assertEqual(6, len(results))
+        self.assertEqual(2, self.session.calls)
+
+    def test_can_be_turned_off(self):
+        api = Altmetric(session = self.session, coalesce = False)
+        list(api.articles_from_dois(["10.1/a"] * 3, max_workers = 3))
+        self.assertEqual(3, self.session.calls)
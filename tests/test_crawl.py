@@ -0,0 +1,92 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.crawl import TimeframeCrawler
+from tests.test_altmetric import FakeResponse, PagedSession
+import json
+import os
+import shutil
+import tempfile
+
+
+class FlakySession(PagedSession):
+    """
+    Pages of articles with Altmetric IDs. Pages listed in failures answer
+    with that status code as many times as given. The first article of
+    every page after the first repeats the last one of the page before.
+    """
+    def __init__(self, num_pages, failures = None, per_page = 3):
+        super(FlakySession, self).__init__(num_pages, per_page)
+        self.failures = dict(failures or {})
+
+    def get(self, url, params = None, headers = None, timeout = None):
+        self.calls.append((url, dict(params or {})))
+        page = params['page']
+        status_code, times = self.failures.get(page, (None, 0))
+        if times:
+            self.failures[page] = (status_code, times - 1)
+            return FakeResponse(status_code)
+        if page > self.num_pages:
+            return FakeResponse(404)
+        first = (page - 1) * self.per_page
+        ids = range(first - 1 if page > 1 else 0, first + self.per_page)
+        return FakeResponse(200, {"results": [{"altmetric_id": i,
+            "doi": "10.1/%d" % i} for i in ids]})
+
+
+class TestTimeframeCrawler(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.directory, "crawl.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def crawler(self, session, **kwargs):
+        api = Altmetric(session = session, max_retries = 0)
+        return TimeframeCrawler(api, '1w', self.checkpoint,
+            backoff_factor = 0, nlmid = ["0410462"], **kwargs)
+
+    def test_crawl_deduplicates(self):
+        crawler = self.crawler(FlakySession(4))
+        dois = [a.doi for a in crawler.run()]
+        self.assertEqual(["10.1/%d" % i for i in range(12)], dois)
+        self.assertEqual(3, crawler.duplicates)
+        self.assertEqual(12, crawler.count)
+        self.assertTrue(crawler.done)
+        self.assertEqual(dois, [a.doi for a in crawler.articles()])
+
+    def test_transient_failures_are_retried(self):
+        session = FlakySession(3, {2: (502, 2)})
+        crawler = self.crawler(session)
+        self.assertEqual(9, len(list(crawler.run())))
+        self.assertEqual(6, len(session.calls))
+
+    def test_resume_after_failure(self):
+        crawler = self.crawler(FlakySession(4, {3: (403, 1)}))
+        articles = crawler.run()
+        self.assertEqual(6, len([next(articles) for i in range(6)]))
+        self.assertRaises(AltmetricHTTPException, list, articles)
+        self.assertEqual(3, crawler.page)
+
+        #Simulate a crash after results were written but before the
+        #checkpoint was.
+        with open(crawler.results, 'a') as fo:
+            fo.write('{"altmetric_id": 99}\n')
+
+        session = FlakySession(4)
+        resumed = self.crawler(session)
+        self.assertEqual(3, resumed.page)
+        dois = [a.doi for a in resumed.run()]
+        self.assertEqual(["10.1/%d" % i for i in range(6, 12)], dois)
+        self.assertEqual(3, session.calls[0][1]['page'])
+        self.assertEqual(["10.1/%d" % i for i in range(12)],
+            [a.doi for a in resumed.articles()])
+
+        with open(self.checkpoint) as fi:
+            self.assertEqual(["0410462"], json.load(fi)['query']['nlmid'])
+
+    def test_query_must_match_checkpoint(self):
+        self.crawler(FlakySession(1))
+        api = Altmetric(session = FlakySession(1))
+        self.assertRaises(IncorrectInput, TimeframeCrawler, api, '1m',
+            self.checkpoint)
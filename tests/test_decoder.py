@@ -0,0 +1,36 @@
+from unittest import TestCase
+from pyaltmetric import *
+import json
+
+
+class TestDecoder(TestCase):
+    def setUp(self):
+        self.default = decoder.decoder_name()
+
+    def tearDown(self):
+        decoder.set_decoder(self.default)
+
+    def test_decoders_agree(self):
+        for filename in ('tests/fixtures/full.json',
+            'tests/fixtures/average.json'):
+            with open(filename, 'rb') as fi:
+                payload = fi.read()
+            for name in ('json', 'orjson'):
+                if name == 'orjson' and decoder.orjson is None:
+                    continue
+                decoder.set_decoder(name)
+                self.assertEqual(json.loads(payload), decoder.loads(payload))
+
+    def test_custom_decoder(self):
+        calls = []
+        def custom(data):
+            calls.append(data)
+            return json.loads(data)
+        decoder.set_decoder(custom)
+        a = Article.from_json_file('tests/fixtures/full.json')
+        self.assertEqual("10.1038/news.2011.490", a.doi)
+        self.assertEqual(1, len(calls))
+        self.assertEqual('custom', decoder.decoder_name())
+
+    def test_unknown_decoder(self):
+        self.assertRaises(ValueError, decoder.set_decoder, 'yaml')
@@ -0,0 +1,87 @@
+from unittest import TestCase, mock
+from pyaltmetric import *
+from tests.test_altmetric import (FakeResponse, FakeSession,
+    FakeAsyncResponse, FakeAsyncSession)
+from tests.test_ratelimit import SequenceSession
+import asyncio
+import json
+
+
+class RecordingObserver(RequestObserver):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(('before', event.method, event.identifier,
+            event.attempt))
+
+    def after_response(self, event):
+        self.calls.append(('after', event.status_code, event.bytes > 0,
+            event.decode_time is not None))
+
+    def on_error(self, event, exception):
+        self.calls.append(('error', type(exception).__name__))
+
+    def on_parse(self, article, seconds):
+        self.calls.append(('parse', article.doi))
+
+
+class TestHooks(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        url = "http://api.altmetric.com/v1/doi/10.1038/news.2011.490"
+        self.session = FakeSession({url: FakeResponse(200, self.raw_dict),
+            "http://api.altmetric.com/v1/doi/forbidden": FakeResponse(403)})
+
+    def test_callbacks(self):
+        observer = RecordingObserver()
+        api = Altmetric(session = self.session, observers = [observer])
+        api.article_from_doi("10.1038/news.2011.490")
+        self.assertEqual([
+            ('before', 'doi', '10.1038/news.2011.490', 0),
+            ('after', 200, True, True),
+            ('parse', '10.1038/news.2011.490')], observer.calls)
+
+    def test_error_callback(self):
+        observer = RecordingObserver()
+        api = Altmetric(session = self.session)
+        api.add_observer(observer)
+        self.assertRaises(AltmetricHTTPException, api.article_from_doi,
+            "forbidden")
+        self.assertEqual(('error', 'AltmetricHTTPException'),
+            observer.calls[-1])
+
+    @mock.patch('pyaltmetric.time.sleep')
+    def test_retries_are_reported(self, sleep):
+        observer = RecordingObserver()
+        session = SequenceSession([FakeResponse(502),
+            FakeResponse(200, self.raw_dict)])
+        api = Altmetric(session = session, observers = [observer])
+        api.article_from_doi("10.1038/news.2011.490")
+        self.assertEqual([502, 200], [call[1] for call in observer.calls
+            if call[0] == 'after'])
+        self.assertEqual([0, 1], [call[3] for call in observer.calls
+            if call[0] == 'before'])
+
+    def test_metrics_aggregator(self):
+        metrics = MetricsAggregator()
+        api = Altmetric(session = self.session, observers = [metrics])
+        api.article_from_doi("10.1038/news.2011.490")
+        api.article_from_pmid("1")
+        snapshot = metrics.snapshot()
+        self.assertEqual({'doi': 1, 'pmid': 1}, snapshot['requests'])
+        self.assertEqual({200: 1, 404: 1}, snapshot['statuses'])
+        self.assertEqual(1, snapshot['articles'])
+        self.assertEqual(2, snapshot['latency']['total_time']['count'])
+        self.assertTrue(snapshot['bytes'] > 0)
+
+    def test_async_callbacks(self):
+        observer = RecordingObserver()
+        url = "http://api.altmetric.com/v1/doi/10.1038/news.2011.490"
+        session = FakeAsyncSession({url: FakeAsyncResponse(200,
+            self.raw_dict)})
+        api = AsyncAltmetric(session = session, observers = [observer])
+        asyncio.run(api.article_from_doi("10.1038/news.2011.490"))
+        self.assertEqual(['before', 'after', 'parse'],
+            [call[0] for call in observer.calls])
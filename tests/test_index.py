@@ -0,0 +1,76 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.index import ArticleIndex
+from tests.test_altmetric import FakeSession
+import datetime
+import json
+import os
+import shutil
+import tempfile
+
+
+class TestArticleIndex(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        self.raws = []
+        for i in range(5):
+            self.raws.append(dict(self.raw_dict, altmetric_id = i,
+                doi = "10.1/%d" % i, pmid = str(100 + i),
+                score = float(i * 10), added_on = 1000 * i,
+                issns = ["0000-000%d" % (i % 2)]))
+        self.index = ArticleIndex()
+        self.assertEqual(5, self.index.add_many(
+            [Article(r) for r in self.raws] + [None]))
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_identifier_lookups(self):
+        self.assertEqual("10.1/2", self.index.by_pmid("102").doi)
+        self.assertEqual("3", self.index.by_doi("10.1/3").altmetric_id)
+        self.assertEqual("3", self.index.by_doi("10.1/3".upper())
+            .altmetric_id)
+        self.assertEqual("10.1/4", self.index.by_altmetric_id(4).doi)
+        self.assertEqual(None, self.index.by_doi("10.1/9"))
+        self.assertEqual(5, len(self.index))
+
+    def test_issn_lookup(self):
+        self.assertEqual(["10.1/0", "10.1/2", "10.1/4"],
+            sorted(a.doi for a in self.index.by_issn("0000-0000")))
+
+    def test_range_queries(self):
+        self.assertEqual(["10.1/3", "10.1/2"],
+            [a.doi for a in self.index.score_between(15, 35)])
+        self.assertEqual(["10.1/0", "10.1/1"],
+            [a.doi for a in self.index.added_between(end = 1000)])
+        start = datetime.datetime.fromtimestamp(3000)
+        self.assertEqual(["10.1/3", "10.1/4"],
+            [a.doi for a in self.index.added_between(start)])
+
+    def test_replace(self):
+        self.index.add(dict(self.raws[0], score = 99.0, issns = []))
+        self.assertEqual(99.0, self.index.by_doi("10.1/0").score)
+        self.assertEqual(2, len(self.index.by_issn("0000-0000")))
+
+    def test_persistent(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "index.sqlite")
+            with ArticleIndex(path) as index:
+                index.add_many(self.raws)
+            with ArticleIndex(path) as index:
+                self.assertEqual("10.1/1", index.by_pmid(101).doi)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_altmetric_consults_index(self):
+        session = FakeSession()
+        api = Altmetric(session = session, index = self.index)
+        self.assertEqual("10.1/1", api.article_from_doi("10.1/1").doi)
+        self.assertEqual([], session.calls)
+        self.assertEqual(None, api.article_from_doi("10.1/9"))
+        self.assertEqual(1, len(session.calls))
+
+    def test_bad_method(self):
+        self.assertRaises(IncorrectInput, self.index.lookup, 'isbn', "1")
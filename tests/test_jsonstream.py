@@ -0,0 +1,55 @@
+from unittest import TestCase
+from pyaltmetric.jsonstream import ResultsScanner
+import json
+
+
+class TestResultsScanner(TestCase):
+    def setUp(self):
+        self.page = {
+            "query": {"results": [{"not": "these"}], "total": 3},
+            "results": [
+                {"title": "Braces }]{[ and \"quotes\" in strings",
+                    "history": {"1d": 1}, "subjects": ["a", "b"]},
+                {"title": "Backslash \\\\", "score": 1.5},
+                {"title": "Non-ASCII ü中"},
+            ],
+            "more": [{"z": 1}],
+        }
+        self.body = json.dumps(self.page, ensure_ascii = False) \
+            .encode('utf-8')
+
+    def scan(self, chunk_size):
+        scanner = ResultsScanner()
+        results = []
+        for start in range(0, len(self.body), chunk_size):
+            results.extend(scanner.feed(self.body[start:start + chunk_size]))
+        return results + scanner.close()
+
+    def test_any_chunk_size(self):
+        for chunk_size in (1, 2, 5, 64, len(self.body)):
+            self.assertEqual(self.page['results'], self.scan(chunk_size))
+
+    def test_objects_are_returned_when_complete(self):
+        scanner = ResultsScanner()
+        end = self.body.index(b'}, {"title": "Backslash') + 1
+        self.assertEqual(self.page['results'][:1],
+            scanner.feed(self.body[:end]))
+        self.assertEqual([], scanner.feed(self.body[end:end + 3]))
+
+    def test_close_returns_waiting_objects(self):
+        scanner = ResultsScanner()
+        self.assertEqual([], scanner.feed(b'{"results": [{"doi": "10.1/a'))
+        self.assertEqual([], scanner.feed(b'"}]}'))
+        self.assertEqual([{"doi": "10.1/a"}], scanner.close())
+
+    def test_empty_page(self):
+        scanner = ResultsScanner()
+        self.assertEqual([], scanner.feed(b'{}'))
+        self.assertEqual([], scanner.close())
+        self.assertTrue(scanner.empty)
+
+    def test_incomplete_document(self):
+        scanner = ResultsScanner()
+        scanner.feed(self.body[:-1])
+        self.assertRaises(ValueError, scanner.close)
+        self.assertRaises(ValueError, ResultsScanner().close)
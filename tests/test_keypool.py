@@ -0,0 +1,83 @@
+from unittest import TestCase
+from pyaltmetric import *
+from tests.test_altmetric import FakeResponse, FakeSession
+import requests
+
+
+class KeySession(FakeSession):
+    """Answers 200, or the status code given for a key."""
+    def __init__(self, refusals = None):
+        super(KeySession, self).__init__()
+        self.refusals = refusals or {}
+        self.keys = []
+
+    def get(self, url, params = None, headers = None, timeout = None):
+        self.calls.append((url, dict(params or {})))
+        self.keys.append(params.get('key'))
+        status_code = self.refusals.get(params.get('key'))
+        if status_code:
+            return FakeResponse(status_code)
+        return FakeResponse(200, {"doi": url.split("/doi/", 1)[-1]})
+
+
+class TestKeyPool(TestCase):
+    def test_round_robin(self):
+        pool = KeyPool(["a", "b", "c"])
+        session = KeySession()
+        api = Altmetric(session = session, key_pool = pool)
+        for i in range(6):
+            api.article_from_doi("10.1/%d" % i)
+        self.assertEqual(["a", "b", "c", "a", "b", "c"], session.keys)
+        self.assertEqual(2, pool.usage()["b"]['requests'])
+        self.assertEqual({200: 2}, pool.usage()["b"]['statuses'])
+
+    def test_least_loaded_weighs_budgets(self):
+        pool = KeyPool({"small": 1000000, "big": 3000000},
+            strategy = 'least_loaded')
+        for i in range(8):
+            pool.release(pool.acquire(), 200)
+        usage = pool.usage()
+        self.assertEqual(2, usage["small"]['requests'])
+        self.assertEqual(6, usage["big"]['requests'])
+
+    def test_refused_key_is_sidelined(self):
+        pool = KeyPool(["bad", "good"])
+        session = KeySession({"bad": 403})
+        api = Altmetric(session = session, key_pool = pool, max_retries = 1)
+        self.assertEqual("10.1/1", api.article_from_doi("10.1/1").doi)
+        self.assertEqual("10.1/2", api.article_from_doi("10.1/2").doi)
+        self.assertEqual(["bad", "good", "good"], session.keys)
+        usage = pool.usage()
+        self.assertFalse(usage["bad"]['available'])
+        self.assertEqual(1, usage["bad"]['sidelined'])
+        self.assertEqual(1, pool.available())
+
+    def test_all_keys_refused(self):
+        pool = KeyPool(["a"], sideline_seconds = 0.01)
+        session = KeySession({"a": 403})
+        api = Altmetric(session = session, key_pool = pool)
+        self.assertRaises(AltmetricHTTPException, api.article_from_doi, "x")
+        self.assertEqual(1, len(session.keys))
+
+    def test_rate_limit_uses_retry_after(self):
+        pool = KeyPool(["a", "b"])
+        key = pool.acquire()
+        pool.release(key, 420, 0.0)
+        self.assertEqual(2, pool.available())
+        self.assertEqual(1, pool.usage()["a"]['sidelined'])
+
+    def test_key_released_on_any_error(self):
+        class BrokenSession(KeySession):
+            def get(self, url, params = None, headers = None,
+                timeout = None):
+                raise requests.exceptions.TooManyRedirects()
+        pool = KeyPool(["a"])
+        api = Altmetric(session = BrokenSession(), key_pool = pool)
+        self.assertRaises(requests.exceptions.TooManyRedirects,
+            api.article_from_doi, "x")
+        self.assertEqual(0, pool.usage()["a"]['in_flight'])
+        self.assertEqual(1, pool.usage()["a"]['errors'])
+
+    def test_bad_arguments(self):
+        self.assertRaises(ValueError, KeyPool, [])
+        self.assertRaises(ValueError, KeyPool, ["a"], strategy = 'random')
@@ -0,0 +1,43 @@
+from unittest import TestCase
+from pyaltmetric import *
+from benchmarks.mock_server import MockAltmetricServer
+
+
+class TestAgainstMockServer(TestCase):
+    def setUp(self):
+        self.server = MockAltmetricServer(num_pages = 3).start()
+        self.api = Altmetric(api_host = self.server.url)
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def test_article_from_doi(self):
+        article = self.api.article_from_doi("10.1/abc")
+        self.assertEqual("10.1/abc", article.doi)
+        self.assertEqual(None, self.api.article_from_doi("missing"))
+
+    def test_articles_from_timeframe(self):
+        articles = list(self.api.articles_from_timeframe('1w',
+            num_results = 10))
+        self.assertEqual(30, len(articles))
+        self.assertEqual(4, self.server.requests)
+
+    def test_streamed_timeframe(self):
+        observer = MetricsAggregator()
+        self.api.add_observer(observer)
+        streamed = [a.raw_dictionary for a in self.api.articles_from_timeframe(
+            '1w', num_results = 10, stream = True)]
+        self.assertEqual([a.raw_dictionary for a in self.api
+            .articles_from_timeframe('1w', num_results = 10)], streamed)
+        self.assertEqual(30, len(streamed))
+        self.assertEqual(8, observer.snapshot()['requests']['citations'])
+
+    def test_errors_are_retried(self):
+        self.server.error_rate = 0.5
+        api = Altmetric(api_host = self.server.url, backoff_factor = 0.001,
+            max_retries = 20)
+        dois = ["10.1/%d" % i for i in range(10)]
+        results = dict(api.articles_from_dois(dois))
+        self.assertEqual(dois, sorted(results, key = dois.index))
+        api.close()
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.ndjson import read_articles, write_articles
+import io
+import json
+import os
+import shutil
+import tempfile
+
+
+class TestNDJSON(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        with open('tests/fixtures/average.json') as raw_json:
+            self.average = json.load(raw_json)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _round_trip(self, filename):
+        path = os.path.join(self.directory, filename)
+        written = write_articles([Article(self.raw_dict), None, self.average],
+            path)
+        self.assertEqual(2, written)
+        articles = list(read_articles(path))
+        self.assertEqual([self.raw_dict, self.average],
+            [a.raw_dictionary for a in articles])
+
+    def test_round_trip(self):
+        self._round_trip("articles.ndjson")
+
+    def test_round_trip_gzip(self):
+        self._round_trip("articles.ndjson.gz")
+
+    def test_fields(self):
+        source = io.StringIO('{"doi": "10.1/a", "score": 2}\n')
+        article, = read_articles(source, fields = ('score',))
+        self.assertEqual(2, article.score)
+        self.assertRaises(AttributeError, getattr, article, 'doi')
+
+    def test_bad_lines_are_collected(self):
+        source = io.StringIO('{"doi": "10.1/a"}\n\nnot json\n{}\n'
+            '[1, 2]\n{"doi": "10.1/b"}\n')
+        errors = []
+        articles = list(read_articles(source, errors))
+        self.assertEqual(["10.1/a", "10.1/b"], [a.doi for a in articles])
+        self.assertEqual([3, 4, 5], [line for line, text, e in errors])
+
+    def test_strict(self):
+        source = io.StringIO('{"doi": "10.1/a"}\nnot json\n')
+        self.assertRaises(JSONParseException, list,
+            read_articles(source, strict = True))
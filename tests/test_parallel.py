@@ -0,0 +1,62 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.ndjson import write_articles
+from pyaltmetric.parallel import parse_articles, parse_ndjson
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+
+class TestParallelParsing(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            raw_dict = json.load(raw_json)
+        self.raws = [dict(raw_dict, doi = "10.1/%d" % i) for i in range(25)]
+
+    def test_parse_articles_in_order(self):
+        articles = list(parse_articles(self.raws + [{}], chunk_size = 4,
+            workers = 2))
+        self.assertEqual([r['doi'] for r in self.raws],
+            [a.doi for a in articles])
+        self.assertIsInstance(articles[0], CompactArticle)
+        self.assertEqual(Article(self.raws[0]).score_history,
+            articles[0].score_history)
+
+    def test_parse_articles_full(self):
+        articles = list(parse_articles(self.raws[:3], workers = 1,
+            compact = False, fields = ('doi', 'added_on')))
+        self.assertIsInstance(articles[0], Article)
+        self.assertEqual(Article(self.raws[0]).added_on, articles[0].added_on)
+
+    def test_unknown_fields(self):
+        for compact in (True, False):
+            self.assertRaises(IncorrectInput, parse_articles, self.raws,
+                workers = 1, compact = compact, fields = ('dio',))
+        self.assertRaises(IncorrectInput, list, parse_ndjson([],
+            fields = ('dio',)))
+
+    def test_keep_raw(self):
+        articles = list(parse_articles(self.raws[:3], workers = 1,
+            fields = ('doi',), keep_raw = True))
+        self.assertEqual(self.raws[:3], [a.raw_dictionary for a in articles])
+        dropped, = parse_articles(self.raws[:1], workers = 1)
+        self.assertRaises(AttributeError, getattr, dropped, 'raw_dictionary')
+
+    def test_parse_ndjson(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "dump.ndjson.gz")
+            write_articles(self.raws, path)
+            with gzip.open(path, 'at', encoding = 'utf-8') as fo:
+                fo.write("not json\n")
+            errors = []
+            articles = list(parse_ndjson(path, chunk_size = 7, workers = 2,
+                fields = ('doi',), errors = errors))
+            self.assertEqual(25, len(articles))
+            self.assertEqual("10.1/24", articles[-1].doi)
+            self.assertEqual([26], [line for line, text, e in errors])
+        finally:
+            shutil.rmtree(directory)
+
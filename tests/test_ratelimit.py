@@ -0,0 +1,118 @@
+from unittest import TestCase, mock
+from pyaltmetric import *
+from tests.test_altmetric import FakeResponse
+import requests
+import time
+
+
+class SequenceSession(object):
+    """Answers each request with the next response or exception in a list."""
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def get(self, url, params = None, headers = None, timeout = None):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class TestRateLimiter(TestCase):
+    def test_rate_spaces_requests(self):
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for i in range(6):
+            limiter.acquire()
+        self.assertTrue(time.monotonic() - start >= 0.09)
+
+    def test_burst(self):
+        limiter = RateLimiter(1, burst = 5)
+        start = time.monotonic()
+        for i in range(5):
+            limiter.acquire()
+        self.assertTrue(time.monotonic() - start < 0.5)
+
+    def test_per_hour(self):
+        self.assertAlmostEqual(1.0, RateLimiter.per_hour(3600).rate)
+
+    def test_pause(self):
+        limiter = RateLimiter(1000)
+        limiter.pause(0.05)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertTrue(time.monotonic() - start >= 0.04)
+
+    def test_bad_rate(self):
+        self.assertRaises(ValueError, RateLimiter, 0)
+
+    def test_retry_after(self):
+        self.assertEqual(2.0, retry_after({'Retry-After': '2'}))
+        self.assertEqual(None, retry_after({}))
+
+    def test_quota_exhausted(self):
+        self.assertEqual(None, quota_exhausted({}))
+        self.assertEqual(None, quota_exhausted(
+            {'X-HourlyRateLimit-Remaining': '12'}))
+        self.assertEqual(600.0, quota_exhausted(
+            {'X-HourlyRateLimit-Remaining': '0'}, now = 3000.0))
+        self.assertEqual(83400.0, quota_exhausted(
+            {'X-HourlyRateLimit-Remaining': '0',
+            'X-DailyRateLimit-Remaining': '0'}, now = 3000.0))
+
+
+@mock.patch('pyaltmetric.time.sleep')
+class TestRetry(TestCase):
+    def test_retries_rate_limit_then_succeeds(self, sleep):
+        session = SequenceSession([FakeResponse(420), FakeResponse(502),
+            FakeResponse(200, {"title": "x"})])
+        api = Altmetric(session = session)
+        self.assertEqual("x", api.article_from_doi("10.1/x").title)
+        self.assertEqual(3, session.calls)
+        self.assertEqual(2, sleep.call_count)
+
+    def test_honors_retry_after(self, sleep):
+        session = SequenceSession([
+            FakeResponse(420, headers = {'Retry-After': '7'}),
+            FakeResponse(404)])
+        api = Altmetric(session = session)
+        self.assertEqual(None, api.article_from_doi("10.1/x"))
+        sleep.assert_called_once_with(7.0)
+
+    def test_gives_up(self, sleep):
+        session = SequenceSession([FakeResponse(420)] * 3)
+        api = Altmetric(session = session, max_retries = 2)
+        self.assertRaises(AltmetricHTTPException, api.article_from_doi,
+            "10.1/x")
+        self.assertEqual(3, session.calls)
+
+    def test_retries_timeouts(self, sleep):
+        session = SequenceSession([requests.exceptions.Timeout(),
+            FakeResponse(404)])
+        api = Altmetric(session = session)
+        self.assertEqual(None, api.article_from_doi("10.1/x"))
+
+    def test_pauses_when_quota_used_up(self, sleep):
+        session = SequenceSession([FakeResponse(200, {"title": "x"},
+            {'X-HourlyRateLimit-Remaining': '0'})])
+        limiter = RateLimiter(1000)
+        api = Altmetric(session = session, rate_limiter = limiter)
+        self.assertEqual("x", api.article_from_doi("10.1/x").title)
+        self.assertTrue(limiter._paused_until > time.monotonic())
+
+    def test_sidelines_key_when_quota_used_up(self, sleep):
+        session = SequenceSession([FakeResponse(200, {"title": "x"},
+            {'X-DailyRateLimit-Remaining': '0'})])
+        pool = KeyPool(["a", "b"])
+        api = Altmetric(session = session, key_pool = pool)
+        api.article_from_doi("10.1/x")
+        self.assertFalse(pool.usage()["a"]['available'])
+        self.assertEqual(1, pool.available())
+
+    def test_no_retry_for_forbidden(self, sleep):
+        session = SequenceSession([FakeResponse(403)])
+        api = Altmetric(session = session)
+        self.assertRaises(AltmetricHTTPException, api.article_from_doi,
+            "10.1/x")
+        self.assertFalse(sleep.called)
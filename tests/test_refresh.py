@@ -0,0 +1,113 @@
+from unittest import TestCase
+from pyaltmetric import *
+from tests.test_altmetric import FakeResponse
+import json
+
+
+class ConditionalSession(object):
+    """Serves current payloads by DOI and honours If-None-Match."""
+    def __init__(self, payloads, etags = None):
+        self.payloads = payloads
+        self.etags = etags or {}
+        self.calls = []
+
+    def get(self, url, params = None, headers = None, timeout = None):
+        doi = url.split("/doi/", 1)[1]
+        self.calls.append((doi, dict(headers or {})))
+        etag = self.etags.get(doi)
+        if etag and (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+        if doi not in self.payloads:
+            return FakeResponse(404)
+        return FakeResponse(200, self.payloads[doi],
+            {'ETag': etag} if etag else {})
+
+
+class TestRefresh(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        self.old = {}
+        for name in ("same", "changed", "gone"):
+            raw = dict(self.raw_dict, doi = name, last_updated = 100)
+            self.old[name] = Article(raw)
+        self.current = {
+            "same": dict(self.raw_dict, doi = "same", last_updated = 100),
+            "changed": dict(self.raw_dict, doi = "changed",
+                last_updated = 200, score = 1.0),
+        }
+
+    def test_last_updated_fallback(self):
+        api = Altmetric(session = ConditionalSession(self.current))
+        changed = dict((old.doi, new) for old, new
+            in api.refresh(self.old.values()))
+        self.assertEqual(["changed", "gone"], sorted(changed))
+        self.assertEqual(1.0, changed["changed"].score)
+        self.assertEqual(None, changed["gone"])
+
+    def test_etag(self):
+        session = ConditionalSession(self.current,
+            {"same": '"a"', "changed": '"b"'})
+        api = Altmetric(session = session)
+        articles = [self.old["same"], self.old["changed"]]
+        refreshed = dict((old.doi, new) for old, new in api.refresh(articles))
+        self.assertEqual(["changed"], list(refreshed))
+
+        # The second round sends the validators and gets 304s back.
+        session.calls = []
+        articles = [self.old["same"], refreshed["changed"]]
+        self.assertEqual([], list(api.refresh(articles)))
+        self.assertEqual(['"a"', '"b"'], sorted(headers['If-None-Match']
+            for doi, headers in session.calls))
+
+    def test_raw_dictionaries(self):
+        api = Altmetric(session = ConditionalSession(self.current))
+        raws = [self.old["same"].raw_dictionary]
+        self.assertEqual([], list(api.refresh(raws)))
+
+    def test_validators_from_first_fetch(self):
+        cache = MemoryCache()
+        session = ConditionalSession(self.current, {"same": '"a"'})
+        api = Altmetric(session = session, cache = cache)
+        article = api.article_from_doi("same")
+        self.assertEqual({'ETag': '"a"'}, article.validators)
+        self.assertEqual(self.current["same"], article.raw_dictionary)
+
+        # Cached answers keep their validators and their payload.
+        cached = api.article_from_doi("same")
+        self.assertEqual({'ETag': '"a"'}, cached.validators)
+        self.assertNotIn('_validators', cached.raw_dictionary)
+        self.assertEqual(1, len(session.calls))
+
+        self.assertEqual([], list(api.refresh([article])))
+        self.assertEqual({'If-None-Match': '"a"'}, session.calls[-1][1])
+
+    def test_raw_dictionaries_with_validators(self):
+        session = ConditionalSession(self.current, {"same": '"a"'})
+        api = Altmetric(session = session)
+        raw = json.loads(json.dumps(self.current["same"]))
+        original = json.loads(json.dumps(raw))
+        list(api.refresh([raw]))
+        list(api.refresh([(raw, {'ETag': '"a"'})]))
+        self.assertEqual([{}, {'If-None-Match': '"a"'}],
+            [headers for doi, headers in session.calls])
+        self.assertEqual(original, raw)
+
+    def test_refresh_updates_cache(self):
+        cache = MemoryCache()
+        session = ConditionalSession(self.current)
+        api = Altmetric(session = session, cache = cache)
+        list(api.refresh([self.old["changed"]]))
+        self.assertEqual(200, api.article_from_doi("changed").raw_dictionary[
+            'last_updated'])
+        self.assertEqual(1, len(session.calls))
+
+    def test_no_identifier(self):
+        api = Altmetric(session = ConditionalSession({}))
+        self.assertRaises(IncorrectInput, list,
+            api.refresh([Article({"title": "x"})]))
+
+    def test_empty_input(self):
+        api = Altmetric(session = ConditionalSession({}))
+        self.assertRaises(IncorrectInput, list, api.refresh([{}]))
+        self.assertRaises(IncorrectInput, list, api.refresh([None]))
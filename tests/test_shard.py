@@ -0,0 +1,82 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.ndjson import read_articles, write_articles
+from pyaltmetric.shard import (CrawlShard, load_plan, merge_results,
+    plan_shards, save_plan)
+from tests.test_crawl import FlakySession
+import os
+import shutil
+import tempfile
+
+
+class TestPlanShards(TestCase):
+    def test_split_by_list_parameter(self):
+        shards = plan_shards('1w', 'nlmid', ["a", "b", "c", "d", "e"],
+            shards = 2, cited_in = 'twitter')
+        self.assertEqual([["a", "b", "c"], ["d", "e"]],
+            [s.nlmid for s in shards])
+        self.assertEqual(['twitter', 'twitter'], [s.cited_in for s in shards])
+
+    def test_split_by_single_value(self):
+        shards = plan_shards('1w', 'doi_prefix', ["10.1", "10.2", "10.3"])
+        self.assertEqual(["10.1", "10.2", "10.3"],
+            [s.doi_prefix for s in shards])
+        self.assertEqual(3, len(set(s.name for s in shards)))
+
+    def test_split_by_page(self):
+        shards = plan_shards('1w', 'page', pages = 10, shards = 3)
+        self.assertEqual([(1, 4), (5, 7), (8, None)],
+            [(s.first_page, s.last_page) for s in shards])
+
+    def test_keys_and_budgets(self):
+        shards = plan_shards('1w', 'page', pages = 10, shards = 3,
+            api_keys = ["k1", "k2"], requests_per_hour = 3600)
+        self.assertEqual(["k1", "k2", "k1"], [s.api_key for s in shards])
+        self.assertEqual([1800.0, 3600.0, 1800.0],
+            [s.requests_per_hour for s in shards])
+        client = shards[0].client()
+        self.assertEqual({"key": "k1"}, client.api_key)
+        self.assertEqual(0.5, client._rate_limiter.rate)
+
+    def test_bad_plans(self):
+        self.assertRaises(IncorrectInput, plan_shards, '1w', 'journal', ["x"])
+        self.assertRaises(IncorrectInput, plan_shards, '1w', 'page')
+        self.assertRaises(IncorrectInput, plan_shards, '1w', 'nlmid', [])
+        self.assertRaises(IncorrectInput, plan_shards, '1w', 'nlmid', ["a"],
+            nlmid = ["b"])
+
+
+class TestShardCrawl(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_plan_round_trip(self):
+        shards = plan_shards('1w', 'subjects', ["x", "y"], api_keys = ["k"])
+        filename = os.path.join(self.directory, "plan.json")
+        save_plan(shards, filename)
+        self.assertEqual(shards, load_plan(filename))
+
+    def test_page_shards_merge_to_full_crawl(self):
+        sources = []
+        for shard in plan_shards('1w', 'page', pages = 4, shards = 2):
+            client = Altmetric(session = FlakySession(5), max_retries = 0)
+            sources.append(shard.run(self.directory, client))
+        destination = os.path.join(self.directory, "merged.ndjson")
+        self.assertEqual(15, merge_results(sources, destination))
+        self.assertEqual(["10.1/%d" % i for i in range(15)],
+            [a.doi for a in read_articles(destination)])
+
+    def test_merge_keeps_latest_copy(self):
+        first = os.path.join(self.directory, "a.ndjson")
+        second = os.path.join(self.directory, "b.ndjson")
+        write_articles([{"altmetric_id": 1, "last_updated": 5, "score": 1},
+            {"altmetric_id": 2, "score": 2}, {"score": 0}], first)
+        write_articles([{"altmetric_id": 1, "last_updated": 9, "score": 3},
+            {"altmetric_id": 2, "score": 4}, {"score": 0}], second)
+        destination = os.path.join(self.directory, "merged.ndjson")
+        self.assertEqual(4, merge_results([first, second], destination))
+        self.assertEqual([2, 0, 3, 0],
+            [a.score for a in read_articles(destination)])
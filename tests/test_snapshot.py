@@ -0,0 +1,81 @@
+from unittest import TestCase
+from pyaltmetric import *
+from pyaltmetric.batch import NUMERIC_COLUMNS
+from pyaltmetric.snapshot import Snapshot, write_snapshot
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        with open('tests/fixtures/full.json') as raw_json:
+            self.raw_dict = json.load(raw_json)
+        self.raws = [dict(self.raw_dict, altmetric_id = i,
+            doi = "10.1/%d" % i, score = float(i)) for i in range(4)]
+        self.raws[3].pop('readers_count', None)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "articles.snap")
+        self.assertEqual(4, write_snapshot(self.path,
+            [Article(self.raws[0]), None, {}] + self.raws[1:]))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(4, len(snapshot))
+            for raw, view in zip(self.raws, snapshot):
+                article = Article(raw)
+                self.assertEqual(raw, view.raw_dictionary)
+                for name, keys in NUMERIC_COLUMNS:
+                    self.assertEqual(getattr(article, name),
+                        getattr(view, name))
+                self.assertEqual(article.title, view.title)
+                self.assertEqual(article.score_history, view.score_history)
+            self.assertEqual("10.1/3", snapshot[-1].doi)
+            self.assertEqual(None, snapshot[3].readers_count)
+            self.assertRaises(IndexError, snapshot.__getitem__, 4)
+
+    def test_numeric_access_is_lazy(self):
+        with Snapshot(self.path) as snapshot:
+            view = snapshot[2]
+            self.assertEqual(2.0, view.score)
+            self.assertEqual(None, view._article)
+            view.doi
+            self.assertNotEqual(None, view._article)
+
+    def test_standard_library_decoder(self):
+        default = decoder.decoder_name()
+        decoder.set_decoder('json')
+        try:
+            with Snapshot(self.path) as snapshot:
+                self.assertEqual("10.1/1", snapshot[1].doi)
+                self.assertEqual(self.raws[2], snapshot[2].raw_dictionary)
+        finally:
+            decoder.set_decoder(default)
+
+    def test_little_endian(self):
+        with open(self.path, 'rb') as fi:
+            data = fi.read()
+        with Snapshot(self.path) as snapshot:
+            blob = json.dumps(self.raws[0], separators = (',', ':'))
+            self.assertEqual(len(blob.encode('utf-8')),
+                snapshot._offsets[1])
+            self.assertIn(struct.pack('<dddd', 0.0, 1.0, 2.0, 3.0), data)
+
+    def test_column(self):
+        with Snapshot(self.path) as snapshot:
+            column = snapshot.column('score')
+            self.assertEqual([0.0, 1.0, 2.0, 3.0], column.tolist())
+            column.release()
+            self.assertRaises(IncorrectInput, snapshot.column, 'title')
+            self.assertIn('cited_by_tweeters_count', snapshot.column_names)
+
+    def test_not_a_snapshot(self):
+        path = os.path.join(self.directory, "other")
+        with open(path, 'wb') as fo:
+            fo.write(b'{"not": "a snapshot"}')
+        self.assertRaises(IncorrectInput, Snapshot, path)